@@ -0,0 +1,131 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ---------------------------------------------
+# 🧪 graph.threads.net 대신 쓰는 로컬 가짜 서버
+# ---------------------------------------------
+class MockThreadsServer:
+    # latency: 요청마다 기다리는 시간(초), ready_delay: 컨테이너가 FINISHED 가 될 때까지 걸리는 시간
+    # error_rate: 컨테이너 생성/발행이 5xx(일시적 오류)로 실패할 확률
+    def __init__(self, latency=0.0, ready_delay=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.ready_delay = ready_delay
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._containers = {}
+        self._next_id = 0
+        self.counts = {"create": 0, "child": 0, "status": 0, "publish": 0, "token": 0, "error": 0}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def graph_url(self):
+        return f"http://127.0.0.1:{self.port}/v1.0"
+
+    @property
+    def token_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-threads", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _fails(self):
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            if failed: self.counts["error"] += 1
+            return failed
+
+    def _children_ready(self, children):
+        # 캐러셀 부모는 자식 컨테이너가 전부 FINISHED 여야 만들 수 있음 (실제 API와 같게)
+        now = time.monotonic()
+        with self._lock:
+            return bool(children) and all(self._containers.get(c, float("inf")) <= now for c in children)
+
+    def _new_container(self):
+        with self._lock:
+            self._next_id += 1
+            container_id = str(self._next_id)
+            self._containers[container_id] = time.monotonic() + self.ready_delay
+            return container_id
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive (실제 API처럼 연결을 재사용)
+            disable_nagle_algorithm = True  # 헤더/본문이 따로 나가면서 생기는 40ms 지연 방지
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _transient_error(self):
+                self._reply(500, {"error": {"message": "mock transient error", "code": 2, "is_transient": True}})
+
+            def do_GET(self):
+                if mock.latency: time.sleep(mock.latency)
+                url = urlparse(self.path)
+                if url.path in ("/access_token", "/refresh_access_token"):
+                    mock._count("token")
+                    self._reply(200, {"access_token": f"mock-token-{time.time_ns()}", "token_type": "bearer", "expires_in": 5184000})
+                    return
+                container_id = url.path.rsplit("/", 1)[-1]
+                mock._count("status")
+                ready_at = mock._containers.get(container_id)
+                if ready_at is None:
+                    self._reply(400, {"error": {"message": "unknown container", "code": 100}})
+                    return
+                self._reply(200, {"id": container_id, "status": "FINISHED" if time.monotonic() >= ready_at else "IN_PROGRESS"})
+
+            def do_POST(self):
+                if mock.latency: time.sleep(mock.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                path = urlparse(self.path).path
+                if path.endswith("/me/threads"):
+                    mock._count("child" if form.get("is_carousel_item") else "create")
+                    if mock._fails(): return self._transient_error()
+                    if form.get("media_type", [""])[0] == "CAROUSEL" and not mock._children_ready(form.get("children", [""])[0].split(",")):
+                        return self._reply(400, {"error": {"message": "carousel children are not ready", "code": 100}})
+                    self._reply(200, {"id": mock._new_container()})
+                elif path.endswith("/me/threads_publish"):
+                    mock._count("publish")
+                    if mock._fails(): return self._transient_error()
+                    self._reply(200, {"id": f"post-{form.get('creation_id', [''])[0]}"})
+                else:
+                    self._reply(404, {"error": {"message": "not found", "code": 100}})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# 앱 모듈을 불러오기 전에 설정: 스케줄러 스레드는 띄우지 않고, 발행 한도는 측정에 걸리지 않게 크게
+os.environ.setdefault("THREADS_BOT_SCHEDULER", "external")
+os.environ.setdefault("THREADS_BOT_RATE_PER_MINUTE", "1000000000")
+os.environ.setdefault("THREADS_BOT_RATE_BURST", "1000000000")
+os.environ.setdefault("THREADS_BOT_DAILY_CAP", "1000000000")
+os.environ.setdefault("THREADS_BOT_RETRY_BASE_SECONDS", "0.05")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.mock_threads import MockThreadsServer
+from benchmarks.stub_gemini import StubModel
+from benchmarks.synthetic import make_schedules, make_users, write_legacy_schedules, write_secrets
+
+# ---------------------------------------------
+# 🧰 측정 도우미
+# ---------------------------------------------
+class Workspace:
+    # 측정마다 빈 임시 폴더에서 시작 (secrets.json / scheduled.db 는 현재 폴더 기준 경로)
+    def __enter__(self):
+        from threads_bot import draft_cache, history, prefetch, ratelimit, schedule_store, storage
+        self._cwd = os.getcwd()
+        self.path = tempfile.mkdtemp(prefix="threads_bot_bench_")
+        os.chdir(self.path)
+        schedule_store._store = None
+        ratelimit._limiter = None
+        draft_cache._cache = None
+        prefetch._pool = None
+        history._history = None
+        storage._users_cache.update(signature=None, data=None)
+        storage._users_migrated = False
+        return self
+
+    def __exit__(self, *exc):
+        os.chdir(self._cwd)
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+def users_for(n_schedules):
+    # 예약 수에 비례해서 사용자 수도 늘림 (사용자당 계정 3개)
+    return make_users(max(1, min(1000, n_schedules // 1000)))
+
+# ---------------------------------------------
+# ⏱️ 측정 항목
+# ---------------------------------------------
+def bench_users_io(size):
+    from threads_bot import storage
+    with Workspace():
+        users = make_users(max(1, size // 3))
+        write_secrets(storage.SAVE_FILE, users)
+        cold, data = timed(storage.load_all_users)
+        warm, _ = timed(storage.load_all_users)
+        save, _ = timed(storage.save_all_users, data)
+        return {"accounts": size, "load_cold_s": cold, "load_warm_s": warm, "save_s": save,
+                "file_bytes": os.path.getsize(storage.SAVE_FILE)}
+
+def bench_legacy_migration(size):
+    from threads_bot import schedule_store
+    with Workspace():
+        write_legacy_schedules(schedule_store.LEGACY_SCHEDULE_FILE, make_schedules(size, users_for(size)))
+        seconds, store = timed(schedule_store.get_schedule_store)
+        return {"schedules": size, "migrate_s": seconds, "rows": store.count()}
+
+def bench_schedule_store(size):
+    from threads_bot import schedule_store
+    with Workspace():
+        users = users_for(size)
+        schedules = make_schedules(size, users)
+        store = schedule_store.get_schedule_store()
+        add_s, _ = timed(store.add_many, schedules)
+        user = next(iter(users))
+        page_s, (_, user_rows) = timed(store.query, user, limit=20)
+        next_due_s, _ = timed(store.next_due_at)
+        add_one_s, _ = timed(store.add, dict(schedules[0]))
+        return {"schedules": size, "add_many_s": add_s, "user_rows": user_rows, "query_page_s": page_s,
+                "next_due_s": next_due_s, "add_one_s": add_one_s}
+
+def bench_drain(size, latency, ready_delay, error_rate):
+    from threads_bot import publisher, schedule_store, scheduler, storage
+    with Workspace(), MockThreadsServer(latency=latency, ready_delay=ready_delay, error_rate=error_rate) as mock:
+        publisher.GRAPH_URL, publisher.TOKEN_URL = mock.graph_url, mock.token_url
+        users = users_for(size)
+        write_secrets(storage.SAVE_FILE, users)  # 토큰은 발행할 때 사용자 파일에서 찾음
+        store = schedule_store.get_schedule_store()
+        store.add_many(make_schedules(size, users, start=datetime(2000, 1, 1), spread_minutes=60))
+        started = time.perf_counter()
+        rounds = 0
+        while True:
+            counts = store.count_by_status()
+            if not counts.get("pending") and not counts.get("retrying"): break
+            scheduler.process_due_schedules()
+            rounds += 1
+            if counts.get("retrying") and not counts.get("pending"): time.sleep(0.02)
+        seconds = time.perf_counter() - started
+        failed = store.count("failed")
+        return {"schedules": size, "accounts": sum(len(u["threads_accounts"]) for u in users.values()),
+                "drain_s": seconds, "posts_per_s": (size - failed) / seconds if seconds else None,
+                "failed": failed, "rounds": rounds, "http_requests": dict(mock.counts),
+                "latency_s": latency, "ready_delay_s": ready_delay, "error_rate": error_rate}
+
+def bench_carousel(images, latency, ready_delay):
+    # 글 1개 발행과 이미지 여러 장 캐러셀 1개 발행에 걸리는 시간 비교
+    from threads_bot import publisher
+    with MockThreadsServer(latency=latency, ready_delay=ready_delay) as mock:
+        publisher.GRAPH_URL, publisher.TOKEN_URL = mock.graph_url, mock.token_url
+        urls = [f"https://example.com/{i}.jpg" for i in range(images)]
+        text_s, (text_ok, _) = timed(publisher.post_to_threads, "글", "mock-token")
+        carousel_s, (carousel_ok, message) = timed(publisher.post_to_threads, "글", "mock-token", "CAROUSEL", urls)
+        return {"images": images, "text_post_s": text_s, "carousel_s": carousel_s,
+                "carousel_vs_text": carousel_s / text_s if text_s else None, "ok": bool(text_ok and carousel_ok),
+                "error": None if carousel_ok else str(message), "http_requests": dict(mock.counts),
+                "latency_s": latency, "ready_delay_s": ready_delay}
+
+def bench_history(size):
+    # 발행 기록 size 건을 쌓는 시간(record 는 큐에 넣기만 함)과, 그 뒤 계정 하나의 지난주 기록 조회 시간
+    from threads_bot import history
+    with Workspace():
+        log = history.get_publish_history()
+        accounts = [(f"user{i % 100}", f"계정{i % 3}") for i in range(300)]
+        now = time.time()
+        record_s, _ = timed(lambda: [log.record(*accounts[i % 300], "ok" if i % 10 else "failed", text=f"본문 {i}",
+                                                media_id=f"m{i}", latency_ms=800, source="schedule") for i in range(size)])
+        flush_s, _ = timed(log.flush)
+        # 쌓인 기록을 지난 30일에 고르게 퍼뜨림 (색인의 시각만 바꿈)
+        conn = log._conn()
+        conn.execute("UPDATE entries SET ts = ? - (id % 720) * 3600", (now,))
+        week_ago = now - 7 * 86400
+        query_s, (rows, total) = timed(log.query, "user7", account_names=["계정1"], start=week_ago, end=now, limit=50)
+        counts_s, _ = timed(log.daily_counts, "user7", start=week_ago, end=now)
+        segments = [n for n in os.listdir(log.path) if n.endswith(".jsonl")]
+        return {"entries": size, "record_s": record_s, "record_us_per_entry": record_s / size * 1e6, "flush_s": flush_s,
+                "query_s": query_s, "query_total": total, "query_rows": len(rows), "daily_counts_s": counts_s,
+                "segments": len(segments), "segment_bytes": sum(os.path.getsize(os.path.join(log.path, n)) for n in segments),
+                "index_bytes": os.path.getsize(os.path.join(log.path, "index.db"))}
+
+def bench_drafts(size, gemini_latency, workers):
+    from threads_bot import drafts
+    with Workspace():
+        model = StubModel(latency=gemini_latency)
+        drafts.use_model("stub-key", model)
+        topics = [f"주제 {i}" for i in range(size)]
+        seconds, results = timed(lambda: list(drafts.generate_drafts("stub-key", topics, max_workers=workers, use_cache=False)))
+        cached_s, _ = timed(lambda: list(drafts.generate_drafts("stub-key", topics, max_workers=workers)))
+        return {"topics": size, "workers": workers, "gemini_latency_s": gemini_latency, "generate_s": seconds,
+                "cached_s": cached_s, "errors": sum(1 for r in results if r[3])}
+
+def bench_dashboard(size):
+    from streamlit.testing.v1 import AppTest
+    from threads_bot import schedule_store, storage
+    with Workspace():
+        users = users_for(size)
+        write_secrets(storage.SAVE_FILE, users)
+        user = next(iter(users))
+        schedules = make_schedules(size, users)
+        for s in schedules[:max(1, size // 10)]: s["user"] = user
+        schedule_store.get_schedule_store().add_many(schedules)
+        at = AppTest.from_file(os.path.join(REPO_ROOT, "streamlit_app.py"), default_timeout=120)
+        at.session_state["logged_in_user"] = user
+        first_s, _ = timed(at.run)
+        rerun_s, _ = timed(at.run)
+        if at.exception:
+            return {"schedules": size, "error": at.exception[0].value}
+        return {"schedules": size, "user_rows": sum(1 for s in schedules if s["user"] == user),
+                "first_render_s": first_s, "rerun_s": rerun_s}
+
+# ---------------------------------------------
+# 📄 실행 및 결과 저장
+# ---------------------------------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스레드 봇 성능 측정 (로컬 가짜 API 사용)")
+    parser.add_argument("--sizes", default="1000,10000", help="쉼표로 구분한 데이터 크기 (예: 1000,100000,1000000)")
+    parser.add_argument("--only", default="", help="이 항목만 실행 (users_io,legacy_migration,schedule_store,drain,carousel,history,drafts,dashboard)")
+    parser.add_argument("--drain-max", type=int, default=5000, help="발행 측정에 쓸 최대 예약 수")
+    parser.add_argument("--latency", type=float, default=0.005, help="가짜 스레드 API 요청당 지연(초)")
+    parser.add_argument("--ready-delay", type=float, default=0.0, help="컨테이너가 준비될 때까지 걸리는 시간(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="컨테이너 생성/발행이 일시적으로 실패할 확률")
+    parser.add_argument("--gemini-latency", type=float, default=0.05, help="가짜 Gemini 응답 지연(초)")
+    parser.add_argument("--draft-workers", type=int, default=4)
+    parser.add_argument("--out", default=os.path.join(REPO_ROOT, "benchmarks", "report.json"))
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = {s.strip() for s in args.only.split(",") if s.strip()}
+    cases = [
+        ("users_io", lambda n: bench_users_io(n)),
+        ("legacy_migration", lambda n: bench_legacy_migration(n)),
+        ("schedule_store", lambda n: bench_schedule_store(n)),
+        ("drain", lambda n: bench_drain(min(n, args.drain_max), args.latency, args.ready_delay, args.error_rate)),
+        ("carousel", lambda n: bench_carousel(max(2, min(n, 20)), args.latency, args.ready_delay)),
+        ("history", lambda n: bench_history(n)),
+        ("drafts", lambda n: bench_drafts(min(n, 1000), args.gemini_latency, args.draft_workers)),
+        ("dashboard", lambda n: bench_dashboard(n)),
+    ]
+
+    results = []
+    for name, run in cases:
+        if only and name not in only: continue
+        for size in sizes:
+            try:
+                result = run(size)
+            except ImportError as e:
+                result = {"skipped": str(e)}
+            results.append({"name": name, "size": size, **result})
+            print(f"{name:>16} {size:>9}  " + ", ".join(
+                f"{k}={v:.4f}" if isinstance(v, float) else f"{k}={v}" for k, v in result.items()), flush=True)
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+        "results": results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import time
+
+# ---------------------------------------------
+# 🤖 Gemini 대신 쓰는 가짜 모델 (drafts.use_model 로 끼워 넣음)
+# ---------------------------------------------
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+class StubModel:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        if self.latency: time.sleep(self.latency)
+        topic = prompt.split("[주제]: ", 1)[-1].split("\n", 1)[0]
+        return _Response(f"{topic} 얘기 좀 해볼게\n가짜 초안 {self.calls}번째\n#벤치마크")
@@ -0,0 +1,47 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+POST_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# ---------------------------------------------
+# 🏭 가짜 사용자/예약 데이터 만들기
+# ---------------------------------------------
+def make_users(n_users, accounts_per_user=3):
+    return {
+        f"user{u}": {
+            "password": "bench",
+            "gemini_api_key": f"stub-key-{u}",
+            "threads_accounts": {
+                f"계정{a}": {"secret": "bench-secret", "token": f"token-{u}-{a}"} for a in range(accounts_per_user)
+            },
+        }
+        for u in range(n_users)
+    }
+
+def make_schedules(n, users, start=None, spread_minutes=60 * 24 * 30, seed=0):
+    # start 부터 spread_minutes 안에 고르게 흩어진 예약. start 가 과거면 전부 바로 발행 대상
+    rng = random.Random(seed)
+    start = start or datetime(2030, 1, 1)
+    accounts = [(uid, acc_name, acc["token"]) for uid, udata in users.items()
+                for acc_name, acc in udata["threads_accounts"].items()]
+    schedules = []
+    for i in range(n):
+        uid, acc_name, token = accounts[rng.randrange(len(accounts))]
+        post_time = start + timedelta(minutes=rng.randrange(max(1, spread_minutes)))
+        schedules.append({
+            "user": uid, "account_name": acc_name, "token": token,
+            "text": f"벤치마크 게시물 {i} " + "가" * rng.randrange(20, 200),
+            "post_time": post_time.strftime(POST_TIME_FORMAT),
+            "status": "pending",
+        })
+    return schedules
+
+def write_secrets(path, users):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(users, f, indent=4)
+
+def write_legacy_schedules(path, schedules):
+    # 예전 버전의 scheduled.json 형식 (ScheduleStore 가 처음 열 때 DB로 옮김)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{"id": i, **s} for i, s in enumerate(schedules)], f, indent=4)
@@ -0,0 +1,97 @@
+import time
+_script_started = time.perf_counter()
+
+import streamlit as st
+
+from threads_bot.metrics import (
+    CONTAINER_WAIT_SECONDS, GEMINI_SECONDS, POSTS_DEFERRED, POSTS_FAILED, POSTS_PUBLISHED, PUBLISH_LAG_SECONDS,
+    QUEUE_DEPTH, RENDER_SECONDS, STORAGE_SECONDS, THREADS_API_SECONDS, DRAFTS, render_prometheus,
+)
+from threads_bot import ui
+from threads_bot.core import get_core
+
+get_core()
+
+# 어떤 히스토그램을 어떤 이름으로 보여줄지 (라벨 이름, 표시 이름)
+LATENCY_VIEWS = (
+    (GEMINI_SECONDS, None, "Gemini 초안 생성"),
+    (THREADS_API_SECONDS, "phase", "스레드 API"),
+    (CONTAINER_WAIT_SECONDS, None, "컨테이너 준비 대기"),
+    (STORAGE_SECONDS, "op", "저장소"),
+    (RENDER_SECONDS, "part", "화면 그리기"),
+)
+
+def _fmt_ms(seconds):
+    if seconds is None: return "-"
+    if seconds == float("inf"): return "초과"
+    return f"{seconds * 1000:,.0f}ms"
+
+def _latency_rows():
+    rows = []
+    for histogram, label, title in LATENCY_VIEWS:
+        for labels, state in sorted(histogram.samples(), key=lambda s: str(s[0])):
+            if not state["count"]: continue
+            rows.append({
+                "구분": f"{title} · {labels[label]}" if label else title,
+                "횟수": state["count"],
+                "평균": _fmt_ms(state["sum"] / state["count"]),
+                "p50 (이하)": _fmt_ms(histogram.quantile(0.5, state)),
+                "p95 (이하)": _fmt_ms(histogram.quantile(0.95, state)),
+            })
+    return rows
+
+def _account_rows(current_user):
+    # 다른 사용자의 계정 이름은 보여주지 않음
+    rows = {}
+    for counter, column in ((POSTS_PUBLISHED, "발행 성공"), (POSTS_FAILED, "발행 실패"), (POSTS_DEFERRED, "한도로 미룸")):
+        for labels, value in counter.samples():
+            if labels.get("user") != current_user: continue
+            row = rows.setdefault(labels["account"], {"계정": labels["account"], "발행 성공": 0, "발행 실패": 0, "한도로 미룸": 0})
+            row[column] += value
+    return sorted(rows.values(), key=lambda r: r["계정"])
+
+# ---------------------------------------------
+# 📊 성능 지표 화면
+# ---------------------------------------------
+current_user, _ = ui.require_login(_script_started, __file__)
+ui.render_sidebar(current_user)
+
+st.title("📊 성능 지표")
+st.caption("이 서버 프로세스가 시작된 뒤부터 모은 값입니다. 스케줄러를 따로 실행 중이면(THREADS_BOT_SCHEDULER=external) "
+           "발행 관련 지표는 그 프로세스의 지표 파일/포트에서 확인하세요.")
+st.button("🔄 새로고침")
+
+st.subheader("📬 예약 대기열")
+depth = {labels.get("status"): value for labels, value in QUEUE_DEPTH.samples()}
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("⏰ 대기 중", depth.get("pending", 0))
+col2.metric("🔁 재시도 대기", depth.get("retrying", 0))
+col3.metric("🚀 발행 중", depth.get("processing", 0))
+col4.metric("❌ 실패", depth.get("failed", 0))
+
+lag = PUBLISH_LAG_SECONDS.samples()
+if lag and lag[0][1]["count"]:
+    state = lag[0][1]
+    st.caption(f"⏱️ 예약 시각 → 실제 발행 지연: 평균 {state['sum'] / state['count']:.1f}초, "
+               f"p95 {PUBLISH_LAG_SECONDS.quantile(0.95, state):,.0f}초 이하 (총 {state['count']}건)")
+
+st.subheader("👤 내 계정별 발행")
+account_rows = _account_rows(current_user)
+if account_rows: st.dataframe(account_rows, hide_index=True)
+else: st.info("아직 이 서버에서 발행한 기록이 없습니다.")
+
+drafts = {(labels.get("source"), labels.get("result")): value for labels, value in DRAFTS.samples()}
+st.caption(f"📝 초안 생성: Gemini 호출 {drafts.get(('api', 'ok'), 0)}건 (실패 {drafts.get(('api', 'error'), 0)}건), "
+           f"저장된 초안 재사용 {drafts.get(('cache', 'ok'), 0)}건")
+
+st.subheader("⏱️ 구간별 소요 시간")
+latency_rows = _latency_rows()
+if latency_rows: st.dataframe(latency_rows, hide_index=True)
+else: st.info("아직 측정된 값이 없습니다.")
+
+with st.expander("📤 프로메테우스 형식으로 보기"):
+    prometheus_text = render_prometheus()
+    st.code(prometheus_text, language="text")
+    st.download_button("⬇️ metrics.prom 내려받기", prometheus_text, file_name="metrics.prom", mime="text/plain")
+
+ui.record_render_time(_script_started, __file__)
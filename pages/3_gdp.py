@@ -0,0 +1,60 @@
+import time
+_script_started = time.perf_counter()
+
+import streamlit as st
+
+from threads_bot.gdp import get_gdp_table
+from threads_bot.metrics import RENDER_SECONDS
+
+def _fmt_usd(value):
+    if value is None: return "-"
+    if value >= 1e12: return f"${value / 1e12:,.2f}조"
+    if value >= 1e8: return f"${value / 1e8:,.0f}억"
+    return f"${value:,.0f}"
+
+def _fmt_pct(value):
+    return "-" if value is None else f"{value:+.1f}%"
+
+# ---------------------------------------------
+# 🌍 나라별 GDP (data/gdp_data.csv 를 미리 변환해 둔 배열에서 조회)
+# ---------------------------------------------
+st.title("🌍 나라별 GDP")
+table = get_gdp_table()
+first_year, last_year = table.years[0], table.years[-1]
+
+st.subheader("🏆 연도별 GDP 순위")
+col_year, col_n = st.columns([3, 1])
+with col_year: year = st.slider("연도", first_year, last_year, last_year)
+with col_n: top_n = st.number_input("상위 몇 개", min_value=1, max_value=50, value=10)
+
+summary = table.year_summary(year)
+col1, col2, col3 = st.columns(3)
+col1.metric("자료가 있는 나라", summary["countries"])
+col2.metric("전체 합계", _fmt_usd(summary["world_total"]))
+col3.metric("중앙값", _fmt_usd(summary["median"]))
+
+top_rows = table.top(year, int(top_n))
+st.dataframe([{"순위": rank, "나라": name, "코드": code, "GDP": _fmt_usd(value), "전년 대비": _fmt_pct(growth)}
+              for rank, name, code, value, growth in top_rows], hide_index=True)
+st.bar_chart({"나라": [name for _, name, _, _, _ in top_rows], "GDP (US$)": [value for _, _, _, value, _ in top_rows]},
+             x="나라", y="GDP (US$)", horizontal=True)
+
+st.subheader("📈 나라별 성장 추이")
+countries = table.countries()
+labels = {f"{name} ({code})": code for name, code in countries}
+default = [label for label, code in labels.items() if code in ("KOR", "JPN")]
+selected = st.multiselect("나라 선택", list(labels), default=default)
+start, end = st.slider("기간", first_year, last_year, (2000, last_year))
+
+if selected:
+    rows = []
+    chart = {"연도": list(range(start, end + 1))}
+    for label in selected:
+        result = table.growth_between(labels[label], start, end)
+        chart[result["name"]] = [value for _, value, _ in result["series"]]
+        rows.append({"나라": result["name"], f"{start}→{end} 증가율": _fmt_pct(result["total_pct"]),
+                     "연평균 증가율": _fmt_pct(result["cagr_pct"]), f"{end} 순위": table.rank_of(labels[label], end) or "-"})
+    st.line_chart(chart, x="연도")
+    st.dataframe(rows, hide_index=True)
+
+RENDER_SECONDS.observe(time.perf_counter() - _script_started, part="3_gdp.py")
@@ -0,0 +1,21 @@
+import time
+_script_started = time.perf_counter()
+
+import streamlit as st
+
+from threads_bot import ui
+from threads_bot.core import get_core
+
+get_core()
+
+# ---------------------------------------------
+# 📜 발행 기록 (예약/바로 업로드 모든 시도)
+# ---------------------------------------------
+current_user, users_data = ui.require_login(_script_started, __file__)
+ui.render_sidebar(current_user)
+
+st.title("📜 발행 기록")
+st.caption("게시물을 올린 시도가 성공/재시도/실패 모두 한 줄씩 남습니다. 발행된 예약은 예약 목록에서 사라지고 여기에만 남습니다.")
+ui.render_history(current_user, users_data)
+
+ui.record_render_time(_script_started, __file__)
@@ -0,0 +1,18 @@
+import pytest
+
+from threads_bot import draft_cache, history, prefetch, ratelimit, schedule_store, storage
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # 빈 임시 폴더에서 시작 (secrets.json / scheduled.db / publish_history 는 현재 폴더 기준 경로)
+    monkeypatch.chdir(tmp_path)
+    for module, name in ((schedule_store, "_store"), (ratelimit, "_limiter"), (draft_cache, "_cache"),
+                         (prefetch, "_pool"), (history, "_history")):
+        monkeypatch.setattr(module, name, None)
+    monkeypatch.setattr(storage, "_users_cache", {"signature": None, "data": None})
+    monkeypatch.setattr(storage, "_users_migrated", False)
+    return tmp_path
+
+@pytest.fixture
+def store(workspace):
+    return schedule_store.get_schedule_store()
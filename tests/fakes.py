@@ -0,0 +1,11 @@
+class FakeResponse:
+    # requests.Response 대신: 문자열 본문이면 json() 이 ValueError
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.text = body if isinstance(body, str) else str(body)
+        self._body = body
+
+    def json(self):
+        if isinstance(self._body, str):
+            raise ValueError("not json")
+        return self._body
@@ -0,0 +1,40 @@
+import io
+
+from threads_bot.bulk_import import parse_schedule_import
+
+ACCOUNTS = {"main", "sub"}
+
+def _parse(data, filename):
+    return parse_schedule_import(io.BytesIO(data), filename, "alice", ACCOUNTS)
+
+def test_csv_utf8_with_bom():
+    data = "account_name,post_time,text\nmain,2026-01-02 09:00,안녕하세요\n".encode("utf-8-sig")
+    records, errors = _parse(data, "posts.csv")
+    assert errors == []
+    assert records == [{"account_name": "main", "post_time": "2026-01-02 09:00", "text": "안녕하세요", "user": "alice"}]
+
+def test_csv_cp949_from_excel():
+    data = "account_name,post_time,text\r\nmain,2026-01-02 09:00,가나다 한글 본문\r\nsub,2026-01-02 9:5,두 번째\r\n".encode("cp949")
+    records, errors = _parse(data, "엑셀.CSV")
+    assert errors == []
+    assert [r["text"] for r in records] == ["가나다 한글 본문", "두 번째"]
+    assert records[1]["post_time"] == "2026-01-02 09:05"
+
+def test_undecodable_file_is_reported_not_raised():
+    records, errors = _parse(b"account_name,post_time,text\n\xff\xfe\xff\n", "broken.csv")
+    assert records == []
+    assert len(errors) == 1 and "인코딩" in errors[0][1]
+
+def test_bad_rows_are_reported_with_line_numbers():
+    data = "\n".join([
+        '{"account_name": "main", "post_time": "2026-01-02 09:00", "text": "ok"}',
+        '{"account_name": "nobody", "post_time": "2026-01-02 09:00", "text": "x"}',
+        'not json',
+        '',
+        '{"account_name": "sub", "post_time": "tomorrow", "text": "x"}',
+        '{"account_name": "sub", "post_time": "2026-01-02 10:00", "text": "x", "media_urls": ["https://a/1.jpg", "https://a/2.jpg"]}',
+    ]).encode("utf-8")
+    records, errors = _parse(data, "posts.jsonl")
+    assert [line_no for line_no, _ in errors] == [2, 3, 5]
+    assert [r["text"] for r in records] == ["ok", "x"]
+    assert records[1]["media_type"] == "CAROUSEL"
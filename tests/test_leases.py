@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+import time
+
+from threads_bot import scheduler
+from threads_bot.schedule_store import ScheduleStore
+
+def _add(store, n, account_name="main", post_time="2020-01-01 09:00", **fields):
+    return store.add_many([{"user": "alice", "account_name": account_name, "post_time": post_time, "text": f"post {i}", **fields}
+                           for i in range(n)])
+
+def _rows(store):
+    return {s["id"]: s for s in store.query("alice", limit=10000)[0]}
+
+def _claim_until_empty(path, owner, out):
+    store = ScheduleStore(os.path.join(path, "scheduled.db"), legacy_file=os.path.join(path, "none.json"))
+    claimed = []
+    while True:
+        items = store.claim_due(time.time(), owner, 60, limit=7)
+        if not items:
+            break
+        claimed.extend(item["id"] for item in items)
+    out.put((owner, claimed))
+
+def test_claims_from_several_processes_never_overlap(store, workspace):
+    ids = _add(store, 300)
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_claim_until_empty, args=(str(workspace), f"worker-{i}", out)) for i in range(4)]
+    for p in procs: p.start()
+    claimed = dict(out.get(timeout=60) for _ in procs)
+    for p in procs: p.join(60)
+    every = [i for c in claimed.values() for i in c]
+    assert sorted(every) == sorted(ids)
+    owners = {s["id"]: s["lease_owner"] for s in _rows(store).values()}
+    assert all(owners[i] == owner for owner, c in claimed.items() for i in c)
+
+def test_claimed_rows_carry_the_new_lease(store):
+    _add(store, 2)
+    items = store.claim_due(1000.0 + time.time(), "a", 30)
+    assert [item["status"] for item in items] == ["processing", "processing"]
+    assert all(item["lease_owner"] == "a" for item in items)
+    assert store.claim_due(time.time(), "b", 30) == []
+
+def test_expired_lease_can_be_claimed_again(store):
+    [schedule_id] = _add(store, 1)
+    now = time.time()
+    assert [item["id"] for item in store.claim_due(now, "dead", 10)] == [schedule_id]
+    assert store.claim_due(now + 5, "other", 10) == []
+    [item] = store.claim_due(now + 11, "other", 10)
+    assert item["id"] == schedule_id and item["lease_owner"] == "other"
+    # 원래 주인은 이제 결과를 기록할 수 없음
+    assert not store.complete(schedule_id, "dead")
+    assert store.complete(schedule_id, "other")
+
+def test_claims_at_most_per_account_rows_for_each_account(store):
+    _add(store, 5, "main", "2020-01-01 09:00")
+    _add(store, 5, "sub", "2020-01-01 10:00")
+    items = store.claim_due(time.time(), "a", 60, per_account=2)
+    assert sorted(item["account_name"] for item in items) == ["main", "main", "sub", "sub"]
+    assert store.count("pending") == 6
+
+def test_release_many_only_releases_own_leases(store):
+    first, second = _add(store, 2)
+    now = time.time()
+    store.claim_due(now, "a", 1000)
+    assert store.release_many("a", [(first, {"status": "pending", "next_attempt_at": now + 100})]) == 1
+    assert store.release_many("b", [(second, {"status": "pending"})]) == 0
+    rows = _rows(store)
+    assert rows[first]["status"] == "pending" and rows[first]["lease_owner"] is None
+    assert rows[second]["lease_owner"] == "a"
+    assert store.claim_due(now + 50, "c", 60) == []
+    assert [item["id"] for item in store.claim_due(now + 101, "c", 60)] == [first]
+
+def test_defer_due_pushes_back_only_that_account(store):
+    _add(store, 3, "main")
+    _add(store, 1, "sub")
+    now = time.time()
+    assert store.defer_due("alice", "main", now, now + 300) == 3
+    [item] = store.claim_due(now, "a", 60)
+    assert item["account_name"] == "sub"
+    store.complete(item["id"], "a")
+    assert store.next_due_at() == now + 300
+    assert len(store.claim_due(now + 301, "a", 60)) == 3
+
+def test_renew_leases_extends_expiry(store):
+    [schedule_id] = _add(store, 1)
+    store.claim_due(time.time(), "a", 5)
+    before = _rows(store)[schedule_id]["lease_expires"]
+    time.sleep(0.01)
+    assert store.renew_leases([schedule_id], "a", 60) == 1
+    assert _rows(store)[schedule_id]["lease_expires"] >= before + 50
+    assert store.renew_leases([schedule_id], "b", 600) == 0
+
+def test_lease_keeper_renews_while_publishing(store, monkeypatch):
+    monkeypatch.setattr(scheduler, "LEASE_SECONDS", 0.3)
+    [schedule_id] = _add(store, 1)
+    store.claim_due(time.time(), "a", 0.3)
+    with scheduler._LeaseKeeper("a", [schedule_id]) as leases:
+        time.sleep(0.6)
+        assert store.claim_due(time.time(), "b", 0.3) == []
+        leases.discard(schedule_id)
+        time.sleep(0.4)
+    assert [item["lease_owner"] for item in store.claim_due(time.time(), "b", 0.3)] == ["b"]
@@ -0,0 +1,56 @@
+import pytest
+
+from threads_bot import http_client, publisher
+from threads_bot.publisher import is_transient
+
+from .fakes import FakeResponse
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(publisher, "POLL_INITIAL_DELAY", 0.01)
+    monkeypatch.setattr(publisher, "POLL_MAX_DELAY", 0.01)
+    monkeypatch.setattr(publisher, "CONTAINER_TIMEOUT", 0.1)
+    monkeypatch.setattr(publisher.wait_for_container, "__defaults__", (0.1,))
+
+def _serve(monkeypatch, status_responses):
+    # 컨테이너 생성/발행은 항상 성공, 상태 확인은 status_responses 를 차례로 (마지막 것을 반복)
+    calls = iter(status_responses)
+    last = [None]
+
+    def get(url, **kwargs):
+        last[0] = next(calls, last[0])
+        if isinstance(last[0], Exception):
+            raise last[0]
+        return last[0]
+
+    def post(url, **kwargs):
+        return FakeResponse(200, {"id": "published-1" if url.endswith("threads_publish") else "container-1"})
+
+    monkeypatch.setattr(http_client, "get", get)
+    monkeypatch.setattr(http_client, "post", post)
+
+def test_ready_container_is_published(fast_polling, monkeypatch):
+    _serve(monkeypatch, [FakeResponse(200, {"status": "IN_PROGRESS"}), FakeResponse(200, {"status": "FINISHED"})])
+    assert publisher.post_to_threads("글", "token") == (True, "published-1")
+
+def test_network_errors_while_polling_are_kept_in_the_timeout(fast_polling, monkeypatch):
+    _serve(monkeypatch, [http_client.HttpError("Connection refused")])
+    success, err = publisher.post_to_threads("글", "token")
+    assert not success and is_transient(err)
+    assert err.startswith("컨테이너 준비 시간 초과") and "Connection refused" in err
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_non_json_status_response_does_not_raise(fast_polling, monkeypatch, ordered):
+    _serve(monkeypatch, [FakeResponse(200, "<html>maintenance</html>")])
+    [(success, err)] = publisher.post_batch_to_threads([("글", "token")], ordered=ordered)
+    assert not success and is_transient(err)
+    assert "JSON" in err and "maintenance" in err
+
+def test_recovered_polling_still_publishes(fast_polling, monkeypatch):
+    _serve(monkeypatch, [http_client.HttpError("reset"), FakeResponse(503, "busy"), FakeResponse(200, {"status": "FINISHED"})])
+    assert publisher.post_batch_to_threads([("글", "token")], ordered=False) == [(True, "published-1")]
+
+def test_error_status_is_permanent(fast_polling, monkeypatch):
+    _serve(monkeypatch, [FakeResponse(200, {"status": "ERROR", "error_message": "이미지를 받을 수 없음"})])
+    success, err = publisher.post_to_threads("글", "token", "IMAGE", ["https://example.com/a.jpg"])
+    assert not success and not is_transient(err) and "이미지를 받을 수 없음" in err
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from threads_bot import ratelimit, scheduler
+from threads_bot.ratelimit import DAY_SECONDS, RateLimiter
+
+@pytest.fixture
+def limiter(workspace):
+    # 분당 60개 (1초에 하나), 최대 3개까지 모아 둠
+    return RateLimiter(str(workspace / "scheduled.db"), rate_per_minute=60, burst=3, daily_cap=250)
+
+def test_burst_then_one_per_interval(limiter):
+    now = 1000.0
+    assert [limiter.acquire("alice", "main", now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("alice", "main", now) == pytest.approx(1.0)
+    assert limiter.acquire("alice", "main", now + 0.25) == pytest.approx(0.75)
+    assert limiter.acquire("alice", "main", now + 1.0) == 0.0
+    assert limiter.acquire("alice", "main", now + 1.5) == pytest.approx(0.5)
+    assert limiter.interval == pytest.approx(1.0)
+
+def test_refill_is_capped_at_burst(limiter):
+    now = 1000.0
+    for _ in range(3):
+        limiter.acquire("alice", "main", now)
+    # 한참 쉬어도 버킷은 최대 3개까지만 다시 참
+    later = now + 3600
+    assert [limiter.acquire("alice", "main", later) for _ in range(4)][:3] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("alice", "main", later) > 0
+
+def test_sent_posts_are_spaced_by_the_interval(limiter):
+    now, sent = 1000.0, []
+    while len(sent) < 8:
+        wait = limiter.acquire("alice", "main", now)
+        if wait == 0:
+            sent.append(now)
+        else:
+            now += wait
+    gaps = [round(b - a, 6) for a, b in zip(sent[3:], sent[4:])]
+    assert sent[:3] == [1000.0] * 3 and gaps == [1.0] * 4
+
+def test_accounts_have_separate_buckets_shared_across_instances(limiter, workspace):
+    now = 1000.0
+    for _ in range(3):
+        limiter.acquire("alice", "main", now)
+    other = RateLimiter(str(workspace / "scheduled.db"), rate_per_minute=60, burst=3)
+    assert other.acquire("alice", "main", now) > 0
+    assert other.acquire("alice", "sub", now) == 0.0
+    assert other.acquire("bob", "main", now) == 0.0
+
+def test_daily_cap_waits_for_the_oldest_post_to_age_out(workspace):
+    limiter = RateLimiter(str(workspace / "scheduled.db"), rate_per_minute=600, burst=100, daily_cap=5)
+    now = 1000.0
+    for n in range(5):
+        assert limiter.acquire("alice", "main", now + n) == 0.0
+    assert limiter.used_today("alice", "main", now + 10) == 5
+    assert limiter.acquire("alice", "main", now + 10) == pytest.approx(DAY_SECONDS - 10)
+    assert limiter.acquire("alice", "main", now + DAY_SECONDS + 0.5) == 0.0
+
+def test_reserve_slots_defers_the_rest_one_interval_apart(store, limiter, monkeypatch):
+    monkeypatch.setattr(ratelimit, "_limiter", limiter)
+    store.add_many([{"user": "alice", "account_name": "main", "post_time": "2020-01-01 09:00", "text": f"post {i}"}
+                    for i in range(6)])
+    items = store.claim_due(time.time(), "worker", 60, limit=5)
+    leases = scheduler._LeaseKeeper("worker", [item["id"] for item in items])
+    started = time.time()
+    sent = scheduler._reserve_slots(items, leases)
+    assert [item["id"] for item in sent] == [item["id"] for item in items[:3]]
+    rows = {row["id"]: row for row in store.query("alice")[0]}
+    later = [rows[item["id"]]["next_attempt_at"] - started for item in items[3:]]
+    assert later[0] == pytest.approx(1.0, abs=0.5) and later[1] - later[0] == pytest.approx(1.0)
+    assert all(rows[item["id"]]["lease_owner"] is None for item in items[3:])
+    # 가져오지 않았던 여섯 번째 줄도 그 뒤로 미룸
+    unclaimed = [row for row in rows.values() if row["id"] not in {item["id"] for item in items}]
+    assert unclaimed[0]["next_attempt_at"] - started >= later[1]
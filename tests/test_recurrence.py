@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+
+from threads_bot import scheduler
+from threads_bot.publisher import PublishError
+from threads_bot.recurrence import describe, dump_rule, load_rule, next_occurrence, normalize_rule
+from threads_bot.schedule_store import to_post_ts
+
+def test_every_days_crosses_month_ends():
+    rule = {"every_days": 1}
+    assert next_occurrence(rule, datetime(2026, 1, 31, 9, 0), 1) == datetime(2026, 2, 1, 9, 0)
+    assert next_occurrence(rule, datetime(2026, 4, 30, 9, 0), 1) == datetime(2026, 5, 1, 9, 0)
+    assert next_occurrence(rule, datetime(2026, 2, 28, 9, 0), 1) == datetime(2026, 3, 1, 9, 0)
+    assert next_occurrence(rule, datetime(2028, 2, 28, 9, 0), 1) == datetime(2028, 2, 29, 9, 0)
+    # 간격은 날짜 수로 계산 (31일에서 30일 뒤는 다음 달 말일이 아니라 정확히 30일 뒤)
+    assert next_occurrence({"every_days": 30}, datetime(2026, 1, 31, 9, 0), 1) == datetime(2026, 3, 2, 9, 0)
+    assert next_occurrence({"every_days": 30}, datetime(2028, 1, 31, 9, 0), 1) == datetime(2028, 3, 1, 9, 0)
+
+def test_weekdays_cross_february_end():
+    # 2026-02-27 금 → 다음 월요일 3/2, 2028-02-28 월 → 화요일 2/29
+    assert next_occurrence({"weekdays": [0]}, datetime(2026, 2, 27, 20, 30), 1) == datetime(2026, 3, 2, 20, 30)
+    assert next_occurrence({"weekdays": [1]}, datetime(2028, 2, 28, 20, 30), 1) == datetime(2028, 2, 29, 20, 30)
+
+def test_wall_clock_time_is_kept_without_dst_shifts():
+    # 한국 시간에는 서머타임이 없으므로 다른 나라의 서머타임 전환일을 지나도 같은 시각, 정확히 하루 간격
+    last = datetime(2026, 3, 7, 23, 30)  # 미국 3/8, 유럽 3/29 전환
+    occurrences = []
+    for n in range(1, 30):
+        last = next_occurrence({"every_days": 1}, last, n)
+        occurrences.append(last)
+    assert all(o.time() == datetime(2026, 1, 1, 23, 30).time() for o in occurrences)
+    stamps = [to_post_ts(o.strftime("%Y-%m-%d %H:%M")) for o in occurrences]
+    assert {b - a for a, b in zip(stamps, stamps[1:])} == {86400.0}
+
+def test_skips_occurrences_missed_while_stopped():
+    last = datetime(2026, 1, 1, 9, 0)
+    assert next_occurrence({"every_days": 2}, last, 1, after=datetime(2026, 1, 10, 12, 0)) == datetime(2026, 1, 11, 9, 0)
+    assert next_occurrence({"weekdays": [2]}, last, 1, after=datetime(2026, 1, 14, 9, 0)) == datetime(2026, 1, 21, 9, 0)
+
+def test_count_is_exhausted():
+    rule = {"every_days": 1, "count": 3}
+    assert next_occurrence(rule, datetime(2026, 1, 1, 9, 0), 2) == datetime(2026, 1, 2, 9, 0)
+    assert next_occurrence(rule, datetime(2026, 1, 2, 9, 0), 3) is None
+
+def test_until_is_inclusive_and_then_exhausted():
+    rule = {"weekdays": [0, 2, 4], "until": "2026-01-09"}
+    assert next_occurrence(rule, datetime(2026, 1, 7, 9, 0), 1) == datetime(2026, 1, 9, 9, 0)
+    assert next_occurrence(rule, datetime(2026, 1, 9, 9, 0), 2) is None
+
+def test_normalize_rule():
+    assert dump_rule({"weekdays": [4, 0, 0], "count": "5"}) == '{"weekdays":[0,4],"count":5}'
+    assert describe(load_rule(dump_rule({"every_days": 3, "until": "2026-02-01"}))) == "3일마다 ~2026-02-01"
+    for bad in ({"weekdays": [7]}, {"every_days": 0}, {"count": 2}, {"every_days": 1, "count": -1}):
+        with pytest.raises(ValueError):
+            normalize_rule(bad)
+
+# ---- 스케줄러: 반복 예약의 다음 회차 ----
+@pytest.fixture
+def recurring(store, monkeypatch):
+    monkeypatch.setattr(scheduler, "kst_now", lambda: datetime(2026, 1, 15, 12, 0))
+
+    def claim(rule, post_time="2026-01-15 09:00", **fields):
+        store.add({"user": "alice", "account_name": "main", "post_time": post_time, "text": "매일 인사",
+                   "recurrence": dump_rule(rule), **fields})
+        [item] = store.claim_due(to_post_ts(post_time) + 1, "worker", 60)
+        return item, scheduler._LeaseKeeper("worker", [item["id"]])
+    return claim
+
+def _only_row(store):
+    rows, total = store.query("alice")
+    assert total == 1
+    return rows[0]
+
+def test_published_recurring_item_moves_to_next_occurrence(store, recurring):
+    item, leases = recurring({"every_days": 1})
+    scheduler._record_result(item, True, "media-1", leases)
+    row = _only_row(store)
+    assert (row["id"], row["status"], row["post_time"], row["occurrences"]) == (item["id"], "pending", "2026-01-16 09:00", 1)
+    assert row["lease_owner"] is None
+
+def test_failed_recurring_item_keeps_going_with_the_error(store, recurring):
+    item, leases = recurring({"every_days": 1}, attempts=2)
+    scheduler._record_result(item, False, PublishError("권한 없음"), leases)
+    row = _only_row(store)
+    assert (row["status"], row["post_time"], row["occurrences"], row["attempts"]) == ("pending", "2026-01-16 09:00", 1, 0)
+    assert row["error_msg"] == "지난 회차(2026-01-15 09:00) 실패: 권한 없음"
+
+def test_transient_failure_retries_the_same_occurrence(store, recurring):
+    item, leases = recurring({"every_days": 1})
+    scheduler._record_result(item, False, PublishError("503", transient=True), leases)
+    row = _only_row(store)
+    assert (row["status"], row["post_time"], row["occurrences"], row["attempts"]) == ("retrying", "2026-01-15 09:00", 0, 1)
+
+def test_failed_last_occurrence_is_kept_as_failed(store, recurring):
+    item, leases = recurring({"every_days": 1, "count": 1})
+    scheduler._record_result(item, False, PublishError("권한 없음"), leases)
+    row = _only_row(store)
+    assert (row["status"], row["error_msg"]) == ("failed", "권한 없음")
+
+def test_exhausted_recurring_item_is_removed_after_publishing(store, recurring):
+    item, leases = recurring({"every_days": 1, "until": "2026-01-15"})
+    scheduler._record_result(item, True, "media-1", leases)
+    assert store.query("alice") == ([], 0)
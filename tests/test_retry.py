@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from threads_bot import scheduler
+from threads_bot.http_client import HttpError
+from threads_bot.publisher import PublishError, _network_error, _response_error, is_transient
+
+from .fakes import FakeResponse
+
+@pytest.mark.parametrize("status, body, transient", [
+    (429, {"error": {"code": 100}}, True),
+    (500, {"error": {"message": "boom"}}, True),
+    (502, "<html>bad gateway</html>", True),
+    (400, {"error": {"code": 4, "message": "rate limit"}}, True),
+    (400, {"error": {"code": 100, "is_transient": True}}, True),
+    (400, {"error": {"code": 100, "message": "invalid parameter"}}, False),
+    (190, {"error": {"code": 190, "message": "token expired"}}, False),
+    (400, "not json", False),
+    (400, {"error": "plain string"}, False),
+])
+def test_response_error_classification(status, body, transient):
+    err = _response_error("발행 오류", FakeResponse(status, body))
+    assert isinstance(err, PublishError) and err.startswith("발행 오류: ")
+    assert is_transient(err) is transient
+
+def test_network_error_classification():
+    assert is_transient(_network_error("컨테이너 생성 오류", HttpError("timeout")))
+    # 발행 요청이 서버에 닿았을 수 있으면 중복 게시를 막기 위해 재시도하지 않음
+    assert not is_transient(_network_error("발행 오류", HttpError("read timeout"), idempotent=False))
+    assert is_transient(_network_error("발행 오류", HttpError("connect timeout", request_sent=False), idempotent=False))
+    assert not is_transient("평범한 문자열 오류")
+
+@pytest.mark.parametrize("attempts, low, high", [(1, 15, 30), (2, 30, 60), (3, 60, 120), (7, 960, 1920), (8, 1800, 3600), (30, 1800, 3600)])
+def test_retry_delay_bounds(monkeypatch, attempts, low, high):
+    monkeypatch.setattr(scheduler, "RETRY_BASE_SECONDS", 30.0)
+    monkeypatch.setattr(scheduler, "RETRY_MAX_SECONDS", 3600.0)
+    monkeypatch.setattr(scheduler.random, "uniform", lambda a, b: a)
+    assert scheduler.retry_delay(attempts) == low
+    monkeypatch.setattr(scheduler.random, "uniform", lambda a, b: b)
+    assert scheduler.retry_delay(attempts) == high
+
+def test_retry_delay_is_jittered(monkeypatch):
+    monkeypatch.setattr(scheduler, "RETRY_BASE_SECONDS", 30.0)
+    delays = {scheduler.retry_delay(3) for _ in range(50)}
+    assert len(delays) > 1 and all(60 <= d <= 120 for d in delays)
+
+def _claim(store, **fields):
+    store.add({"user": "alice", "account_name": "main", "post_time": "2020-01-01 09:00", "text": "글", **fields})
+    [item] = store.claim_due(time.time(), "worker", 60)
+    return item, scheduler._LeaseKeeper("worker", [item["id"]])
+
+def _row(store):
+    [row], _ = store.query("alice")
+    return row
+
+def test_transient_failure_is_retried_with_backoff(store):
+    item, leases = _claim(store)
+    started = time.time()
+    scheduler._record_result(item, False, PublishError("503", transient=True), leases)
+    row = _row(store)
+    assert (row["status"], row["attempts"], row["lease_owner"]) == ("retrying", 1, None)
+    assert scheduler.RETRY_BASE_SECONDS / 2 <= row["next_attempt_at"] - started <= scheduler.RETRY_BASE_SECONDS + 1
+
+def test_transient_failure_gives_up_after_max_attempts(store):
+    item, leases = _claim(store, attempts=scheduler.RETRY_MAX_ATTEMPTS - 1)
+    scheduler._record_result(item, False, PublishError("503", transient=True), leases)
+    row = _row(store)
+    assert (row["status"], row["attempts"], row["next_attempt_at"]) == ("failed", scheduler.RETRY_MAX_ATTEMPTS, None)
+
+def test_permanent_failure_is_not_retried(store):
+    item, leases = _claim(store)
+    scheduler._record_result(item, False, PublishError("권한 없음"), leases)
+    assert (_row(store)["status"], _row(store)["attempts"]) == ("failed", 1)
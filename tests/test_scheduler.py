@@ -0,0 +1,19 @@
+import threading
+import time
+
+from threads_bot import scheduler
+from threads_bot.schedule_store import ScheduleStore, to_post_time
+
+def test_polling_scheduler_sees_schedules_added_by_another_process(store, workspace, monkeypatch):
+    # 따로 띄운 스케줄러는 notify 를 받지 못해도 짧은 간격으로 DB 변경을 보고 깨어남
+    woke = threading.Event()
+    monkeypatch.setattr(scheduler, "process_due_schedules", lambda: woke.set() or store.claim_due(time.time(), "w", 60))
+    worker = scheduler.Scheduler(rescan_seconds=0.2).start()
+    try:
+        time.sleep(0.3)
+        assert not woke.is_set()
+        other = ScheduleStore(str(workspace / "scheduled.db"), legacy_file=str(workspace / "none.json"))
+        other.add({"user": "alice", "account_name": "main", "post_time": to_post_time(time.time() - 60), "text": "글"})
+        assert woke.wait(2)
+    finally:
+        worker.stop()
@@ -0,0 +1,20 @@
+import json
+import multiprocessing
+import os
+
+from threads_bot import storage
+
+def _bump(path, key, times):
+    os.chdir(path)
+    for _ in range(times):
+        storage.update_all_users(lambda data: data.setdefault(key, {"n": 0}).update(n=data[key]["n"] + 1))
+
+def test_update_all_users_across_processes_keeps_every_write(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_bump, args=(str(tmp_path), f"user{i}", 100)) for i in range(3)]
+    for p in procs: p.start()
+    for p in procs: p.join(60)
+    assert [p.exitcode for p in procs] == [0, 0, 0]
+    with open(tmp_path / storage.SAVE_FILE, encoding="utf-8") as f:
+        assert json.load(f) == {f"user{i}": {"n": 100} for i in range(3)}
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
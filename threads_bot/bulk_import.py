@@ -0,0 +1,97 @@
+import codecs
+import csv
+import json
+import re
+from datetime import datetime
+
+from .publisher import normalize_media
+from .schedule_store import POST_TIME_FORMAT
+
+REQUIRED_FIELDS = ("account_name", "post_time", "text")
+# 스레드 게시글 본문 최대 길이
+MAX_TEXT_LENGTH = 500
+# 한국어 엑셀이 저장한 CSV 는 CP949. UTF-8 로 끝까지 읽히지 않으면 다음 인코딩으로 읽음
+ENCODINGS = ("utf-8-sig", "cp949")
+
+# ---------------------------------------------
+# 📥 예약 일괄 가져오기 (CSV / JSONL)
+# ---------------------------------------------
+def _detect_encoding(fileobj):
+    # 파일을 조각씩 끝까지 한 번 읽어 보고 되감음. 어떤 인코딩으로도 안 읽히면 None
+    for encoding in ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        fileobj.seek(0)
+        try:
+            for chunk in iter(lambda: fileobj.read(1 << 16), b""):
+                decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+        finally:
+            fileobj.seek(0)
+    return None
+
+def _iter_raw_rows(fileobj, filename):
+    # (줄 번호, dict 또는 오류 메시지) 를 한 줄씩 흘려보냄. 파일 전체를 메모리에 올리지 않음.
+    encoding = _detect_encoding(fileobj)
+    if encoding is None:
+        yield 0, "파일 인코딩을 읽을 수 없습니다. UTF-8 또는 CP949(엑셀 기본)로 저장해 주세요."
+        return
+    lines = codecs.iterdecode(fileobj, encoding)
+    if filename.lower().endswith(".csv"):
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, f"JSON 형식 오류: {e}"
+                continue
+            yield line_no, row if isinstance(row, dict) else "JSON 객체가 아닙니다."
+
+def _validate(row, accounts):
+    missing = [k for k in REQUIRED_FIELDS if not str(row.get(k) or "").strip()]
+    if missing:
+        return None, f"필수 항목 누락: {', '.join(missing)}"
+    account_name = str(row["account_name"]).strip()
+    if account_name not in accounts:
+        return None, f"등록되지 않은 계정: {account_name}"
+    try:
+        post_time = datetime.strptime(str(row["post_time"]).strip(), POST_TIME_FORMAT).strftime(POST_TIME_FORMAT)
+    except ValueError:
+        return None, f"시간 형식 오류 (YYYY-MM-DD HH:MM): {row['post_time']}"
+    text = str(row["text"])
+    if len(text) > MAX_TEXT_LENGTH:
+        return None, f"본문이 {MAX_TEXT_LENGTH}자를 넘습니다 ({len(text)}자)"
+    # 선택 항목: media_type (TEXT/IMAGE/CAROUSEL), media_urls (JSONL 은 목록, CSV 는 | 나 공백으로 구분)
+    media_urls = row.get("media_urls") or []
+    if isinstance(media_urls, str):
+        media_urls = re.split(r"[|\s]+", media_urls)
+    try:
+        media_type, media_urls = normalize_media(row.get("media_type"), media_urls)
+    except ValueError as e:
+        return None, str(e)
+    record = {"account_name": account_name, "post_time": post_time, "text": text}
+    if media_type != "TEXT":
+        record.update(media_type=media_type, media_urls=media_urls)
+    return record, None
+
+def parse_schedule_import(fileobj, filename, user, accounts):
+    # 유효한 예약 목록과 [(줄 번호, 오류 메시지), ...] 를 돌려준다
+    records, errors = [], []
+    for line_no, row in _iter_raw_rows(fileobj, filename):
+        if isinstance(row, str):
+            errors.append((line_no, row))
+            continue
+        record, error = _validate(row, accounts)
+        if error:
+            errors.append((line_no, error))
+            continue
+        record["user"] = user
+        records.append(record)
+    return records, errors
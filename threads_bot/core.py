@@ -0,0 +1,79 @@
+import threading
+
+from .history import get_publish_history
+from .prefetch import get_draft_pool
+from .schedule_store import get_schedule_store
+from .scheduler import notify_schedules_changed, publish_now, start_background_scheduler
+from .storage import load_all_users, update_all_users
+from .tokens import renew_expiring_tokens, renew_tokens
+
+# ---------------------------------------------
+# 🧠 페이지들이 같이 쓰는 핵심 기능 (서버 프로세스당 1개)
+# ---------------------------------------------
+class BotCore:
+    # 사용자 파일 캐시, 예약 DB, 초안 풀, 발행 기록, 상주 스케줄러를 한 번만 열어 두고
+    # 모든 페이지는 화면만 그리면서 이 객체를 통해 읽고 쓴다.
+    def __init__(self):
+        self.schedules = get_schedule_store()
+        self.draft_pool = get_draft_pool()
+        self.history = get_publish_history()
+        self.scheduler = start_background_scheduler()
+
+    # ---- 사용자 / 계정 ----
+    def users(self):
+        return load_all_users()
+
+    def update_users(self, mutator):
+        return update_all_users(mutator)
+
+    def renew_tokens(self, user, acc_name, acc_info):
+        return renew_tokens([(user, acc_name, acc_info)])[0]
+
+    def renew_expiring_tokens(self, user):
+        return renew_expiring_tokens(users=[user])
+
+    # ---- 예약 ----
+    def add_schedule(self, item):
+        schedule_id = self.schedules.add(item)
+        notify_schedules_changed()
+        return schedule_id
+
+    def add_schedules(self, items):
+        ids = self.schedules.add_many(items)
+        notify_schedules_changed()
+        return ids
+
+    def edit_schedule(self, schedule_id, **fields):
+        edited = self.schedules.edit(schedule_id, **fields)
+        if edited: notify_schedules_changed()
+        return edited
+
+    def cancel_schedule(self, schedule_id):
+        cancelled = self.schedules.cancel(schedule_id)
+        if cancelled: notify_schedules_changed()
+        return cancelled
+
+    def query_schedules(self, user, **filters):
+        return self.schedules.query(user, **filters)
+
+    # ---- 발행 ----
+    def publish_now(self, item):
+        return publish_now(item)
+
+    # ---- 발행 기록 ----
+    def query_history(self, user, **filters):
+        return self.history.query(user, **filters)
+
+    def history_daily_counts(self, user, **filters):
+        return self.history.daily_counts(user, **filters)
+
+_core = None
+_core_lock = threading.Lock()
+
+def get_core():
+    global _core
+    if _core is None:
+        with _core_lock:
+            if _core is None:
+                _core = BotCore()
+    return _core
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DRAFT_CACHE_DB = "draft_cache.db"
+# 오래 안 쓴 것부터 지워서 이 개수 이하로 유지
+DRAFT_CACHE_MAX_ENTRIES = int(os.environ.get("THREADS_BOT_DRAFT_CACHE_MAX", "5000"))
+# 만든 지 이만큼 지난 초안은 다시 생성 (기본 7일)
+DRAFT_CACHE_TTL_SECONDS = int(os.environ.get("THREADS_BOT_DRAFT_CACHE_TTL", str(7 * 24 * 3600)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_drafts_last_used ON drafts(last_used);
+"""
+
+def cache_key(model_name, prompt, generation_config=None):
+    payload = json.dumps({"model": model_name, "prompt": prompt, "config": generation_config or {}},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ---------------------------------------------
+# 🧊 Gemini 응답 캐시 (세션/프로세스 공용, 디스크 저장)
+# ---------------------------------------------
+class DraftCache:
+    def __init__(self, path=DRAFT_CACHE_DB, max_entries=DRAFT_CACHE_MAX_ENTRIES, ttl_seconds=DRAFT_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT text, created_at FROM drafts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.ttl_seconds:
+            conn.execute("DELETE FROM drafts WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE drafts SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key, text):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO drafts (key, text, created_at, last_used) VALUES (?, ?, ?, ?)",
+                         (key, text, now, now))
+            conn.execute("DELETE FROM drafts WHERE created_at < ?", (now - self.ttl_seconds,))
+            overflow = conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute("DELETE FROM drafts WHERE key IN (SELECT key FROM drafts ORDER BY last_used LIMIT ?)", (overflow,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_draft_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DraftCache()
+    return _cache
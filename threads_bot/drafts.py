@@ -0,0 +1,126 @@
+import csv
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .draft_cache import cache_key, get_draft_cache
+from .metrics import DRAFTS, GEMINI_SECONDS, timer
+
+MODEL_NAME = 'gemini-2.5-flash'
+DRAFT_PROMPT = "당신은 스레드(Threads)에서 활동하는 센스 있는 인플루언서입니다. 다음 [주제]를 바탕으로 스레드에 업로드할 게시글을 작성해주세요.\n[주제]: {topic}\n[절대 지켜야 할 조건]\n1. 인사말이나 부연 설명은 절대 하지 말고 '딱 게시글 본문만' 출력할 것.\n2. 무조건 3줄 이내로 아주 짧고 간결하게 작성할 것.\n3. 친근하고 자연스러운 인터넷 '반말(최신 밈 활용)'로 작성할 것.\n4. 해시태그는 마지막 줄에 1~2개만 넣을 것."
+
+# Gemini 분당 요청 제한에 걸리지 않도록 동시 생성 수는 작게 시작
+DEFAULT_PARALLELISM = 4
+MAX_PARALLELISM = 10
+# 요청 한도 초과(429) 응답이면 잠깐 쉬었다가 다시 시도
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 2.0
+
+# API 키별로 한 번만 만들어 두고 계속 재사용하는 Gemini 모델
+_models = {}
+_models_lock = threading.Lock()
+
+# ---------------------------------------------
+# 🤖 Gemini 클라이언트 (필요할 때만 SDK를 불러옴)
+# ---------------------------------------------
+def _new_model_generate(api_key, prompt, generation_config):
+    # 이 키의 모델이 아직 없을 때: 모델을 만들고 첫 요청까지 잠금 안에서 함.
+    # configure()는 프로세스 전역 설정이지만 GenerativeModel 은 첫 요청 때 그 순간 설정된 클라이언트를 잡아 계속 쓰므로,
+    # 첫 요청이 끝나면 다른 사용자가 다른 키로 configure 해도 이 모델은 계속 자기 키를 씀.
+    with _models_lock:
+        model = _models.get(api_key)
+        if model is not None:
+            return model, None
+        # SDK 로딩이 1초 가까이 걸려서 실제로 생성할 때만 import
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(MODEL_NAME)
+        text = _generate(model, prompt, generation_config)
+        _models[api_key] = model  # 첫 요청이 성공한 키만 남겨 둠
+        return model, text
+
+def _generate_with_key(api_key, prompt, generation_config):
+    model = _models.get(api_key)
+    if model is None:
+        model, text = _new_model_generate(api_key, prompt, generation_config)
+        if text is not None:
+            return text
+    return _generate(model, prompt, generation_config)
+
+def use_model(api_key, model):
+    # 이미 만든 모델(벤치마크용 가짜 모델 등)을 이 키에 묶어 둠. generate_content(prompt, generation_config=...) 만 있으면 됨
+    with _models_lock:
+        _models[api_key] = model
+
+# ---------------------------------------------
+# ✍️ Gemini 초안 생성
+# ---------------------------------------------
+def build_prompt(topic):
+    return DRAFT_PROMPT.format(topic=topic)
+
+def _is_rate_limited(error):
+    return type(error).__name__ in ("ResourceExhausted", "TooManyRequests") or "429" in str(error)
+
+def _generate(model, prompt, generation_config):
+    delay = RATE_LIMIT_BACKOFF
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            return model.generate_content(prompt, generation_config=generation_config).text
+        except Exception as e:
+            if attempt == RATE_LIMIT_RETRIES or not _is_rate_limited(e):
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+def generate_draft(api_key, topic, use_cache=True, generation_config=None):
+    # use_cache=False 면 캐시를 건너뛰고 새로 생성 (새 결과는 캐시에 덮어씀)
+    prompt = build_prompt(topic)
+    key = cache_key(MODEL_NAME, prompt, generation_config)
+    cache = get_draft_cache()
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            DRAFTS.inc(source="cache", result="ok")
+            return cached
+    try:
+        with timer(GEMINI_SECONDS):
+            text = _generate_with_key(api_key, prompt, generation_config)
+    except Exception:
+        DRAFTS.inc(source="api", result="error")
+        raise
+    DRAFTS.inc(source="api", result="ok")
+    cache.put(key, text)
+    return text
+
+def generate_drafts(api_key, topics, max_workers=DEFAULT_PARALLELISM, use_cache=True):
+    # 여러 주제를 동시에 생성하고, 끝나는 순서대로 (순번, 주제, 본문, 오류)를 돌려준다
+    if not topics:
+        return
+    workers = max(1, min(max_workers, MAX_PARALLELISM, len(topics)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-draft") as pool:
+        futures = {pool.submit(generate_draft, api_key, topic, use_cache): (i, topic) for i, topic in enumerate(topics)}
+        for future in as_completed(futures):
+            i, topic = futures[future]
+            try:
+                yield i, topic, future.result(), None
+            except Exception as e:
+                yield i, topic, None, e
+
+def parse_topics(text="", uploaded=None):
+    # 한 줄에 주제 하나. 업로드 파일은 .txt(줄 단위) 또는 .csv(첫 번째 열)
+    lines = [line for line in text.splitlines()]
+    if uploaded is not None:
+        content = uploaded.getvalue().decode("utf-8-sig")
+        if uploaded.name.lower().endswith(".csv"):
+            lines += [row[0] for row in csv.reader(io.StringIO(content)) if row]
+        else:
+            lines += content.splitlines()
+    topics = []
+    seen = set()
+    for line in lines:
+        topic = line.strip()
+        if topic and topic not in seen:
+            seen.add(topic)
+            topics.append(topic)
+    return topics
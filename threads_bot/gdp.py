@@ -0,0 +1,195 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import warnings
+
+import numpy as np
+
+GDP_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gdp_data.csv")
+# CSV 해시별로 변환 결과를 넣어 두는 폴더 (CSV가 바뀌면 새 폴더가 생김)
+CACHE_DIR = os.path.join(os.path.dirname(GDP_CSV), ".gdp_cache")
+CACHE_FORMAT = 1
+
+# 세계은행 CSV에 나라와 섞여 있는 지역/소득 그룹 합계 (순위에서 제외)
+AGGREGATE_CODES = frozenset("""
+AFE AFW ARB CEB CSS EAP EAR EAS ECA ECS EMU EUU FCS HIC HPC IBD IBT IDA IDB IDX INX LAC LCN LDC LIC LMC LMY
+LTE MEA MIC MNA NAC OED OSS PRE PSS PST SAS SSA SSF SST TEA TEC TLA TMN TSA TSS UMC WLD
+""".split())
+
+_ARRAYS = ("values", "growth", "ranking", "world_total", "country_mean", "country_median", "reporting")
+
+# ---------------------------------------------
+# 🔄 CSV → 열 단위 배열 (한 번만 변환해서 저장)
+# ---------------------------------------------
+def _csv_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _parse_csv(path):
+    # 세계은행 wide 형식: 나라 이름, 코드, 지표 이름, 지표 코드, 1960, 1961, ... (빈 칸 = 값 없음)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        year_cols = [(i, int(h)) for i, h in enumerate(header) if h.strip().isdigit()]
+        names, codes, rows = [], [], []
+        for row in reader:
+            if len(row) < 2 or not row[1]:
+                continue
+            names.append(row[0])
+            codes.append(row[1])
+            rows.append([float(row[i]) if i < len(row) and row[i] else np.nan for i, _ in year_cols])
+    return names, codes, [y for _, y in year_cols], np.array(rows, dtype=np.float64).reshape(len(rows), len(year_cols))
+
+def _precompute(values, is_country):
+    # 전년 대비 성장률(%): 전년 값이 없거나 0 이하면 NaN
+    growth = np.full_like(values, np.nan)
+    prev, cur = values[:, :-1], values[:, 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth[:, 1:] = np.where(prev > 0, (cur / prev - 1.0) * 100.0, np.nan)
+
+    # 연도별 순위: 나라(합계 제외)만, 값 큰 순서의 행 번호. 값이 없는 나라는 -1 로 채움
+    country_rows = np.flatnonzero(is_country)
+    country_values = values[country_rows]
+    n_years = values.shape[1]
+    ranking = np.full((n_years, len(country_rows)), -1, dtype=np.int32)
+    reporting = np.zeros(n_years, dtype=np.int32)
+    for y in range(n_years):
+        column = country_values[:, y]
+        valid = np.flatnonzero(~np.isnan(column))
+        order = valid[np.argsort(-column[valid], kind="stable")]
+        ranking[y, :len(order)] = country_rows[order]
+        reporting[y] = len(order)
+
+    with warnings.catch_warnings():
+        # 값이 하나도 없는 연도의 nanmean/nanmedian 경고는 NaN 결과로 충분함
+        warnings.simplefilter("ignore", RuntimeWarning)
+        world_total = np.nansum(country_values, axis=0)
+        country_mean = np.nanmean(country_values, axis=0)
+        country_median = np.nanmedian(country_values, axis=0)
+    world_total[reporting == 0] = np.nan
+    return {"growth": growth, "ranking": ranking, "world_total": world_total,
+            "country_mean": country_mean, "country_median": country_median, "reporting": reporting}
+
+def build_cache(csv_path, cache_path):
+    names, codes, years, values = _parse_csv(csv_path)
+    is_country = np.array([c not in AGGREGATE_CODES for c in codes])
+    arrays = {"values": values, **_precompute(values, is_country)}
+    # 다른 프로세스와 동시에 만들어도 깨진 캐시가 보이지 않도록 임시 폴더에 다 쓴 뒤 이름만 바꿈
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=os.path.dirname(cache_path), prefix=".building-")
+    try:
+        for name in _ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), arrays[name])
+        meta = {"format": CACHE_FORMAT, "names": names, "codes": codes, "years": years,
+                "is_country": is_country.tolist()}
+        with open(os.path.join(tmp_path, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.exists(os.path.join(cache_path, "meta.json")):
+            raise  # 다른 프로세스가 먼저 만든 경우가 아니면 진짜 오류
+
+# ---------------------------------------------
+# 📈 GDP 조회 (메모리 맵으로 열어서 필요한 칸만 읽음)
+# ---------------------------------------------
+class GdpTable:
+    def __init__(self, cache_path):
+        with open(os.path.join(cache_path, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.names = meta["names"]
+        self.codes = meta["codes"]
+        self.years = meta["years"]
+        self.is_country = np.array(meta["is_country"], dtype=bool)
+        for name in _ARRAYS:
+            setattr(self, name, np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode="r"))
+        self._row_by_key = {}
+        for i, (name, code) in enumerate(zip(self.names, self.codes)):
+            self._row_by_key[code.upper()] = i
+            self._row_by_key[name.lower()] = i
+
+    def _year_index(self, year):
+        i = int(year) - self.years[0]
+        if not 0 <= i < len(self.years):
+            raise ValueError(f"{self.years[0]}~{self.years[-1]}년 사이만 조회할 수 있습니다: {year}")
+        return i
+
+    def row(self, country):
+        # 나라 코드(KOR) 또는 이름(Korea, Rep.)으로 찾기
+        i = self._row_by_key.get(country.upper(), self._row_by_key.get(country.lower()))
+        if i is None:
+            raise KeyError(f"알 수 없는 나라: {country}")
+        return i
+
+    def _value(self, array, i, y):
+        v = float(array[i, y])
+        return None if np.isnan(v) else v
+
+    def top(self, year, n=10):
+        # 그 해 GDP 상위 n개 나라: [(순위, 이름, 코드, GDP, 전년 대비 %), ...]
+        y = self._year_index(year)
+        rows = self.ranking[y, :min(n, int(self.reporting[y]))]
+        return [(rank, self.names[i], self.codes[i], float(self.values[i, y]), self._value(self.growth, i, y))
+                for rank, i in enumerate(rows.tolist(), start=1)]
+
+    def rank_of(self, country, year):
+        y = self._year_index(year)
+        i = self.row(country)
+        found = np.flatnonzero(self.ranking[y, :int(self.reporting[y])] == i)
+        return int(found[0]) + 1 if len(found) else None
+
+    def growth_between(self, country, start, end):
+        # start~end 사이 연도별 값과 전년 대비 %, 전체 증가율, 연평균 증가율(CAGR)
+        i = self.row(country)
+        s, e = self._year_index(start), self._year_index(end)
+        if s > e:
+            s, e = e, s
+        series = [(self.years[y], self._value(self.values, i, y), self._value(self.growth, i, y)) for y in range(s, e + 1)]
+        known = [(year, v) for year, v, _ in series if v is not None]
+        total_pct = cagr_pct = None
+        if len(known) >= 2 and known[0][1] > 0:
+            (y0, v0), (y1, v1) = known[0], known[-1]
+            total_pct = (v1 / v0 - 1.0) * 100.0
+            if y1 > y0 and v1 > 0:
+                cagr_pct = ((v1 / v0) ** (1.0 / (y1 - y0)) - 1.0) * 100.0
+        return {"name": self.names[i], "code": self.codes[i], "series": series,
+                "total_pct": total_pct, "cagr_pct": cagr_pct}
+
+    def year_summary(self, year):
+        y = self._year_index(year)
+        return {"year": int(year), "countries": int(self.reporting[y]),
+                "world_total": self._value(self.world_total[None, :], 0, y),
+                "mean": self._value(self.country_mean[None, :], 0, y),
+                "median": self._value(self.country_median[None, :], 0, y)}
+
+    def countries(self):
+        return [(self.names[i], self.codes[i]) for i in np.flatnonzero(self.is_country).tolist()]
+
+_tables = {}
+_tables_lock = threading.Lock()
+_signatures = {}
+
+def get_gdp_table(csv_path=GDP_CSV, cache_dir=CACHE_DIR):
+    # CSV 파일이 그대로면(수정 시각/크기) 해시도 다시 계산하지 않고 열어 둔 표를 그대로 씀
+    st = os.stat(csv_path)
+    signature = (st.st_mtime_ns, st.st_size)
+    with _tables_lock:
+        known = _signatures.get(csv_path)
+        if known is not None and known[0] == signature:
+            return _tables[known[1]]
+        digest = _csv_hash(csv_path)
+        table = _tables.get(digest)
+        if table is None:
+            cache_path = os.path.join(cache_dir, f"{digest[:16]}-v{CACHE_FORMAT}")
+            if not os.path.exists(os.path.join(cache_path, "meta.json")):
+                build_cache(csv_path, cache_path)
+            table = _tables[digest] = GdpTable(cache_path)
+        _signatures[csv_path] = (signature, digest)
+        return table
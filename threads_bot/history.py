@@ -0,0 +1,233 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from .metrics import STORAGE_SECONDS, timer
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = "publish_history"
+# 조각 파일이 이 크기를 넘거나 날짜(한국 시간)가 바뀌면 새 파일로
+HISTORY_SEGMENT_BYTES = int(os.environ.get("THREADS_BOT_HISTORY_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+# 기록은 모아서 한 번에 씀: 최대 이만큼, 첫 기록 뒤 이 시간 안에 들어온 것까지
+HISTORY_BATCH_SIZE = int(os.environ.get("THREADS_BOT_HISTORY_BATCH", "500"))
+HISTORY_FLUSH_SECONDS = float(os.environ.get("THREADS_BOT_HISTORY_FLUSH_SECONDS", "0.5"))
+KST = timezone(timedelta(hours=9))
+# 결과: ok (발행 성공), retry (일시적 오류, 다시 시도 예정), failed (실패 확정)
+OUTCOMES = ("ok", "retry", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    account_name TEXT NOT NULL,
+    UNIQUE (user, account_name)
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    ts REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    segment_id INTEGER NOT NULL REFERENCES segments(id),
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_account_ts ON entries(account_id, ts);
+"""
+
+def _kst_day(ts):
+    return datetime.fromtimestamp(ts, KST).strftime("%Y-%m-%d")
+
+# ---------------------------------------------
+# 📜 발행 기록 (추가만 하는 JSONL 조각 파일 + SQLite 색인)
+# ---------------------------------------------
+class PublishHistory:
+    # 발행 시도 한 번마다 한 줄. 본문은 조각 파일에만 한 번 쓰고, 색인(index.db)에는
+    # (계정 번호, 시각, 결과, 파일/위치)만 둬서 "계정 X의 지난주 기록"은 색인 범위 조회 + 그 줄만 읽기로 끝난다.
+    # 발행하는 쪽은 큐에 넣기만 하고, 쓰기는 전용 스레드가 모아서 한 번에 한다.
+    # 조각 파일 이름에 프로세스 번호를 넣어 화면 서버와 따로 띄운 스케줄러가 같은 파일에 섞여 쓰지 않게 한다.
+    def __init__(self, path=HISTORY_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._segment = None  # (번호, 열린 파일, 날짜) — 쓰기 스레드만 사용
+        self._account_ids = {}
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.path, "index.db"), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---- 쓰기 (발행 경로에서는 record 만 호출) ----
+    def record(self, user, account_name, outcome, **fields):
+        entry = {"ts": time.time(), "user": user, "account": account_name, "outcome": outcome}
+        entry.update((k, v) for k, v in fields.items() if v is not None)
+        self._queue.put(entry)
+        if self._writer is None:
+            self._start_writer()
+
+    def _start_writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_forever, name="publish-history", daemon=True)
+                self._writer.start()
+
+    def flush(self, timeout=None):
+        # 큐에 들어온 기록이 다 쓰일 때까지 기다림. 다 썼으면 True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def _write_forever(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + HISTORY_FLUSH_SECONDS
+            while len(batch) < HISTORY_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with timer(STORAGE_SECONDS, op="history_write"):
+                    self._write_batch(batch)
+            except Exception:
+                logger.exception("발행 기록 %d건 저장 실패", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _open_segment(self, conn, ts):
+        # 지금 쓰는 조각 파일 (크기를 넘었거나 날짜가 바뀌었으면 새로 엶)
+        day = _kst_day(ts)
+        if self._segment is not None:
+            segment_id, f, segment_day = self._segment
+            if segment_day == day and f.tell() < HISTORY_SEGMENT_BYTES:
+                return segment_id, f
+            f.close()
+        name = f"{datetime.fromtimestamp(ts, KST):%Y%m%d-%H%M%S}-{os.getpid()}-{time.time_ns() % 1000000:06d}.jsonl"
+        f = open(os.path.join(self.path, name), 'ab')
+        segment_id = conn.execute("INSERT INTO segments (name) VALUES (?)", (name,)).lastrowid
+        self._segment = (segment_id, f, day)
+        return segment_id, f
+
+    def _account_id(self, conn, user, account_name):
+        account_id = self._account_ids.get((user, account_name))
+        if account_id is None:
+            conn.execute("INSERT OR IGNORE INTO accounts (user, account_name) VALUES (?, ?)", (user, account_name))
+            account_id = conn.execute("SELECT id FROM accounts WHERE user = ? AND account_name = ?",
+                                      (user, account_name)).fetchone()[0]
+            self._account_ids[(user, account_name)] = account_id
+        return account_id
+
+    def _write_batch(self, batch):
+        # 본문을 먼저 파일 끝에 한 번에 붙이고, 그 위치를 색인에 한 트랜잭션으로 넣음
+        # (중간에 죽으면 색인에 없는 줄이 파일에 남을 뿐 기록이 꼬이지는 않음)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            segment_id, f = self._open_segment(conn, batch[0]["ts"])
+            offset = f.seek(0, os.SEEK_END)
+            lines, rows = [], []
+            for entry in batch:
+                line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                rows.append((self._account_id(conn, entry["user"], entry["account"]), entry["ts"], entry["outcome"],
+                             segment_id, offset, len(line) - 1))
+                lines.append(line)
+                offset += len(line)
+            f.write(b"".join(lines))
+            f.flush()
+            conn.executemany("INSERT INTO entries (account_id, ts, outcome, segment_id, offset, length) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            # 방금 만든 계정/조각 번호도 취소됐으므로 다시 확인
+            self._account_ids = {}
+            if self._segment is not None:
+                self._segment[1].close()
+                self._segment = None
+            raise
+
+    # ---- 읽기 ----
+    def _where(self, user, account_names=None, start=None, end=None, outcomes=None):
+        ids = [r["id"] for r in self._conn().execute("SELECT id, account_name FROM accounts WHERE user = ?", (user,))
+               if not account_names or r["account_name"] in account_names]
+        clauses = [f"account_id IN ({', '.join('?' * len(ids))})"]
+        params = list(ids)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end)
+        if outcomes:
+            clauses.append(f"outcome IN ({', '.join('?' * len(outcomes))})")
+            params.extend(outcomes)
+        return (" AND ".join(clauses), params) if ids else (None, None)
+
+    def query(self, user, account_names=None, start=None, end=None, outcomes=None, limit=50, offset=0):
+        # start/end: epoch 초 [start, end). 최신순 기록 목록과 조건에 맞는 전체 개수를 돌려준다.
+        where, params = self._where(user, account_names, start, end, outcomes)
+        if where is None:
+            return [], 0
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM entries WHERE {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT s.name, e.offset, e.length FROM entries e JOIN segments s ON s.id = e.segment_id"
+            f" WHERE {where} ORDER BY e.ts DESC, e.id DESC LIMIT ? OFFSET ?", (*params, limit, offset)).fetchall()
+        return self._read_entries(rows), total
+
+    def _read_entries(self, rows):
+        # 같은 조각 파일은 한 번만 열고, 필요한 줄만 위치로 찾아 읽음
+        entries = [None] * len(rows)
+        by_segment = {}
+        for i, r in enumerate(rows):
+            by_segment.setdefault(r["name"], []).append((i, r["offset"], r["length"]))
+        for name, spots in by_segment.items():
+            try:
+                with open(os.path.join(self.path, name), 'rb') as f:
+                    for i, offset, length in sorted(spots, key=lambda s: s[1]):
+                        f.seek(offset)
+                        entries[i] = json.loads(f.read(length))
+            except (OSError, ValueError) as e:
+                logger.warning("발행 기록 파일을 읽을 수 없습니다 (%s): %s", name, e)
+        return [e for e in entries if e is not None]
+
+    def daily_counts(self, user, account_names=None, start=None, end=None):
+        # {(날짜, 결과): 개수} — 색인만 읽음
+        where, params = self._where(user, account_names, start, end)
+        if where is None:
+            return {}
+        rows = self._conn().execute(
+            f"SELECT date(ts, 'unixepoch', '+9 hours') AS day, outcome, COUNT(*) AS n FROM entries WHERE {where}"
+            " GROUP BY day, outcome", params)
+        return {(r["day"], r["outcome"]): r["n"] for r in rows}
+
+_history = None
+_history_lock = threading.Lock()
+
+def get_publish_history():
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = PublishHistory()
+                atexit.register(_history.flush, 5)
+    return _history
@@ -0,0 +1,51 @@
+import os
+import threading
+
+# 연결은 짧게, 응답은 넉넉하게 기다림 (타임아웃이 없으면 멈춘 소켓 하나가 스크립트 전체를 붙잡음)
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 30
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+# 호스트당 유지할 keep-alive 연결 수 (동시 발행 스레드 수보다 넉넉하게)
+POOL_MAXSIZE = int(os.environ.get("THREADS_BOT_HTTP_POOL", "32"))
+
+_session = None
+_session_lock = threading.Lock()
+
+class HttpError(Exception):
+    # 연결 실패/타임아웃 등 응답을 받지 못한 경우 (requests 예외를 감싼 것)
+    # request_sent=False 면 서버에 요청이 닿지도 않은 것 (다시 보내도 중복될 걱정이 없음)
+    def __init__(self, message, request_sent=True):
+        super().__init__(message)
+        self.request_sent = request_sent
+
+# ---------------------------------------------
+# 🔌 프로세스 전체가 같이 쓰는 keep-alive 세션
+# ---------------------------------------------
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # requests 는 실제로 API를 부를 때 처음 불러옴 (페이지 첫 로딩을 가볍게)
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def request(method, url, **kwargs):
+    import requests
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    try:
+        return get_session().request(method, url, **kwargs)
+    except requests.RequestException as e:
+        raise HttpError(str(e), request_sent=not isinstance(e, requests.ConnectTimeout)) from e
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,222 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# 초 단위 지연 시간용 기본 구간 (5ms ~ 2분)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# 예약 시각 대비 실제 발행 지연용 구간 (1초 ~ 1일)
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 21600, 86400)
+
+# 프로메테우스 텍스트를 주기적으로 써 둘 파일 / 값을 내보낼 로컬 포트 (비워 두면 사용 안 함)
+METRICS_FILE = os.environ.get("THREADS_BOT_METRICS_FILE", "")
+METRICS_PORT = int(os.environ.get("THREADS_BOT_METRICS_PORT", "0"))
+EXPORT_INTERVAL_SECONDS = 15
+
+# ---------------------------------------------
+# 📊 프로세스 안에서 모으는 지표 (카운터 / 게이지 / 히스토그램)
+# ---------------------------------------------
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(sorted(labels.items()))
+
+    def samples(self):
+        with self._lock:
+            return [(dict(k), v) for k, v in self._values.items()]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 구간별 개수 (마지막 칸은 +Inf), 합계, 전체 개수
+                state = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        with self._lock:
+            return [(dict(k), {"counts": list(v["counts"]), "sum": v["sum"], "count": v["count"]})
+                    for k, v in self._values.items()]
+
+    def quantile(self, q, state):
+        # 구간 경계로 어림한 분위수 (화면 표시용)
+        if not state["count"]:
+            return None
+        target = q * state["count"]
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), state["counts"]):
+            running += n
+            if running >= target:
+                return bound
+        return float("inf")
+
+@contextmanager
+def timer(histogram, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name, help_text=""):
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name, help_text=""):
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def metrics(self):
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda m: m.name)
+
+REGISTRY = Registry()
+
+# ---- 앱 곳곳에서 쓰는 지표 ----
+GEMINI_SECONDS = REGISTRY.histogram("threads_bot_gemini_request_seconds", "Gemini 초안 생성 호출 시간")
+DRAFTS = REGISTRY.counter("threads_bot_drafts_total", "생성한 초안 수 (source=cache|api, result=ok|error)")
+THREADS_API_SECONDS = REGISTRY.histogram("threads_bot_threads_api_seconds", "스레드 API 호출 시간 (phase=create|status|publish|token)")
+CONTAINER_WAIT_SECONDS = REGISTRY.histogram("threads_bot_container_wait_seconds", "컨테이너 생성 후 발행 가능해질 때까지 기다린 시간")
+STORAGE_SECONDS = REGISTRY.histogram("threads_bot_storage_seconds", "사용자 파일/예약 DB 읽기·쓰기 시간 (op=...)")
+RENDER_SECONDS = REGISTRY.histogram("threads_bot_render_seconds", "화면 그리기 시간 (part=...)")
+POSTS_PUBLISHED = REGISTRY.counter("threads_bot_posts_published_total", "발행 성공 수 (계정별)")
+POSTS_FAILED = REGISTRY.counter("threads_bot_posts_failed_total", "발행 실패 수 (계정별, final=true 면 더 이상 재시도 안 함)")
+POSTS_DEFERRED = REGISTRY.counter("threads_bot_posts_deferred_total", "발행 한도 때문에 미룬 수 (계정별)")
+QUEUE_DEPTH = REGISTRY.gauge("threads_bot_queue_depth", "상태별 예약 개수")
+PUBLISH_LAG_SECONDS = REGISTRY.histogram("threads_bot_publish_lag_seconds", "예약 시각부터 실제 발행까지 걸린 시간", buckets=LAG_BUCKETS)
+
+# ---------------------------------------------
+# 📤 프로메테우스 텍스트 형식으로 내보내기
+# ---------------------------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(registry=REGISTRY):
+    lines = []
+    for metric in registry.metrics():
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in metric.samples():
+            if metric.kind != "histogram":
+                lines.append(f"{metric.name}{_format_labels(labels)} {_format_number(value)}")
+                continue
+            running = 0
+            for bound, n in zip(metric.buckets + (float("inf"),), value["counts"]):
+                running += n
+                lines.append(f"{metric.name}_bucket{_format_labels({**labels, 'le': _format_number(bound)})} {running}")
+            lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_number(value['sum'])}")
+            lines.append(f"{metric.name}_count{_format_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+def write_metrics_file(path=METRICS_FILE):
+    # node_exporter textfile collector 등이 읽어 가도록 원자적으로 교체
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+def _export_forever():
+    while True:
+        time.sleep(EXPORT_INTERVAL_SECONDS)
+        try:
+            write_metrics_file()
+        except OSError:
+            logger.exception("지표 파일 저장 실패")
+
+def _serve_metrics(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    # 외부에 열지 않고 이 서버 안에서만 (프로메테우스 에이전트가 같은 서버에서 긁어 감)
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+def start_metrics_exporter():
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+        if METRICS_FILE:
+            threading.Thread(target=_export_forever, name="metrics-file", daemon=True).start()
+        if METRICS_PORT:
+            try:
+                _serve_metrics(METRICS_PORT)
+            except OSError:
+                logger.exception("지표 포트 %d 를 열 수 없음", METRICS_PORT)
@@ -0,0 +1,254 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from .draft_cache import DRAFT_CACHE_DB
+from .drafts import _is_rate_limited, generate_draft
+from .storage import load_all_users
+
+logger = logging.getLogger(__name__)
+
+# 사이드바의 "시간대별 추천템" 시간대 → (표시 이름, 올릴 시각)
+PREFETCH_SLOTS = {"morning": ("☀️ 아침 / 점심", 9), "afternoon": ("🌤️ 오후 (식후)", 14), "evening": ("🌙 저녁 / 취침전", 21)}
+PREFETCH_DAYS = {"all": "매일", "weekday": "평일", "weekend": "주말"}
+# 앞으로 이 시간 안에 돌아오는 시간대의 초안만 미리 만들어 둠
+PREFETCH_HORIZON_HOURS = float(os.environ.get("THREADS_BOT_PREFETCH_HORIZON_HOURS", "24"))
+PREFETCH_INTERVAL_SECONDS = int(os.environ.get("THREADS_BOT_PREFETCH_INTERVAL", "600"))
+# Gemini API 키 하나당 동시에 보내는 요청 수와 하루에 미리 만드는 초안 수 (화면에서 직접 만드는 건 따로)
+PREFETCH_CONCURRENCY = int(os.environ.get("THREADS_BOT_PREFETCH_CONCURRENCY", "2"))
+PREFETCH_DAILY_QUOTA = int(os.environ.get("THREADS_BOT_PREFETCH_DAILY_QUOTA", "50"))
+PREFETCH_WORKERS = int(os.environ.get("THREADS_BOT_PREFETCH_WORKERS", "4"))
+# 시간대가 지난 뒤에도 이만큼은 목록에 남겨 둠
+PREFETCH_KEEP_HOURS = float(os.environ.get("THREADS_BOT_PREFETCH_KEEP_HOURS", "6"))
+KST = timezone(timedelta(hours=9))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS draft_pool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    account_name TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    slot_at REAL NOT NULL,
+    topic TEXT NOT NULL,
+    text TEXT,
+    error TEXT,
+    status TEXT NOT NULL DEFAULT 'ready',
+    created_at REAL NOT NULL,
+    UNIQUE (user, account_name, slot_at, topic)
+);
+CREATE INDEX IF NOT EXISTS idx_draft_pool_user ON draft_pool(user, status, slot_at);
+CREATE TABLE IF NOT EXISTS prefetch_usage (
+    key_hash TEXT NOT NULL,
+    day TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (key_hash, day)
+);
+"""
+
+def key_hash(api_key):
+    # 사용량 기록에는 키 자체를 남기지 않음
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+def _kst_day(now):
+    return datetime.fromtimestamp(now, KST).strftime("%Y-%m-%d")
+
+def upcoming_slots(plan, now, horizon_hours=PREFETCH_HORIZON_HOURS):
+    # plan: {"account", "slot", "days", "topic"} → now 이후 horizon 안에 돌아오는 그 시간대 시각(epoch) 목록
+    _, hour = PREFETCH_SLOTS[plan["slot"]]
+    days = plan.get("days", "all")
+    until = now + horizon_hours * 3600
+    today = datetime.fromtimestamp(now, KST).date()
+    slots = []
+    for offset in range(int(horizon_hours // 24) + 2):
+        day = today + timedelta(days=offset)
+        if days == "weekday" and day.weekday() >= 5: continue
+        if days == "weekend" and day.weekday() < 5: continue
+        slot_at = datetime(day.year, day.month, day.day, hour, tzinfo=KST).timestamp()
+        if now < slot_at <= until:
+            slots.append(slot_at)
+    return slots
+
+def slot_label(slot, slot_at):
+    return f"{datetime.fromtimestamp(slot_at, KST):%m/%d %H:%M} {PREFETCH_SLOTS.get(slot, (slot,))[0]}"
+
+# ---------------------------------------------
+# 🧺 사용자별 초안 풀 (draft_cache.db 에 같이 저장)
+# ---------------------------------------------
+class DraftPool:
+    # 한 (사용자, 계정, 시간대 시각, 주제)에 초안 1개. 화면에서 가져가거나 버려도 줄은 남겨 둬서
+    # 같은 시간대를 다시 만들지 않고, 시간대가 지나면 지운다.
+    def __init__(self, path=DRAFT_CACHE_DB):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def missing(self, jobs):
+        # jobs: [(user, account_name, slot_at, topic), ...] 중 아직 풀에 없는 것만
+        conn = self._conn()
+        return [job for job in jobs if conn.execute(
+            "SELECT 1 FROM draft_pool WHERE user = ? AND account_name = ? AND slot_at = ? AND topic = ?", job).fetchone() is None]
+
+    def put(self, user, account_name, slot, slot_at, topic, text=None, error=None):
+        self._conn().execute(
+            "INSERT OR IGNORE INTO draft_pool (user, account_name, slot, slot_at, topic, text, error, status, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (user, account_name, slot, slot_at, topic, text, error, "error" if error else "ready", time.time()))
+
+    def ready_for(self, user):
+        rows = self._conn().execute(
+            "SELECT * FROM draft_pool WHERE user = ? AND status IN ('ready', 'error') ORDER BY slot_at, id", (user,))
+        return [dict(r) for r in rows]
+
+    def get(self, draft_id):
+        row = self._conn().execute("SELECT * FROM draft_pool WHERE id = ?", (draft_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def take(self, draft_id):
+        # 화면에서 쓰기로 한 초안 (다른 탭에서 먼저 가져갔으면 None)
+        conn = self._conn()
+        draft = self.get(draft_id)
+        if draft is None or conn.execute(
+                "UPDATE draft_pool SET status = 'used' WHERE id = ? AND status = 'ready'", (draft_id,)).rowcount == 0:
+            return None
+        return draft
+
+    def discard(self, draft_id):
+        # 오류로 남은 줄을 버리면 다음 차례에 다시 만들도록 지우고, 초안은 버린 것으로만 표시
+        conn = self._conn()
+        conn.execute("DELETE FROM draft_pool WHERE id = ? AND status = 'error'", (draft_id,))
+        conn.execute("UPDATE draft_pool SET status = 'discarded' WHERE id = ?", (draft_id,))
+
+    def prune(self, now=None):
+        now = now or time.time()
+        return self._conn().execute("DELETE FROM draft_pool WHERE slot_at < ?", (now - PREFETCH_KEEP_HOURS * 3600,)).rowcount
+
+    # ---- API 키별 하루 사용량 ----
+    def used_today(self, api_key, now=None):
+        row = self._conn().execute("SELECT used FROM prefetch_usage WHERE key_hash = ? AND day = ?",
+                                   (key_hash(api_key), _kst_day(now or time.time()))).fetchone()
+        return row[0] if row else 0
+
+    def reserve(self, api_key, quota, now=None):
+        # 한도 안이면 1건 쓰고 True
+        now = now or time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM prefetch_usage WHERE day < ?", (_kst_day(now - 7 * 86400),))
+            params = (key_hash(api_key), _kst_day(now))
+            row = conn.execute("SELECT used FROM prefetch_usage WHERE key_hash = ? AND day = ?", params).fetchone()
+            used = row[0] if row else 0
+            if used >= quota:
+                conn.execute("COMMIT")
+                return False
+            conn.execute("INSERT OR REPLACE INTO prefetch_usage (key_hash, day, used) VALUES (?, ?, ?)", (*params, used + 1))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_draft_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DraftPool()
+    return _pool
+
+# ---------------------------------------------
+# ⚡ 미리 만들기 (설정에서 켠 사용자만)
+# ---------------------------------------------
+_key_slots = {}
+_key_slots_lock = threading.Lock()
+
+def _key_semaphore(api_key):
+    with _key_slots_lock:
+        sem = _key_slots.get(api_key)
+        if sem is None:
+            sem = _key_slots[api_key] = threading.BoundedSemaphore(max(1, PREFETCH_CONCURRENCY))
+        return sem
+
+def pending_jobs(users, now):
+    # [(api_key, user, account_name, slot, slot_at, topic), ...] 풀에 아직 없는 것만, 시간대가 가까운 순서
+    pool = get_draft_pool()
+    jobs = []
+    for uid, udata in users.items():
+        config = udata.get("draft_prefetch") or {}
+        api_key = udata.get("gemini_api_key")
+        if not config.get("enabled") or not api_key:
+            continue
+        accounts = udata.get("threads_accounts", {})
+        for plan in config.get("plans", []):
+            if plan.get("account") not in accounts or plan.get("slot") not in PREFETCH_SLOTS or not plan.get("topic"):
+                continue
+            for slot_at in upcoming_slots(plan, now):
+                jobs.append((api_key, uid, plan["account"], plan["slot"], slot_at, plan["topic"]))
+    missing = set(pool.missing([(uid, acc, slot_at, topic) for _, uid, acc, _, slot_at, topic in jobs]))
+    jobs = [job for job in jobs if (job[1], job[2], job[4], job[5]) in missing]
+    return sorted(jobs, key=lambda job: job[4])
+
+def _prefetch_one(job, quota):
+    api_key, uid, acc_name, slot, slot_at, topic = job
+    pool = get_draft_pool()
+    with _key_semaphore(api_key):
+        if not pool.reserve(api_key, quota):
+            return False
+        try:
+            text = generate_draft(api_key, topic, use_cache=False)
+        except Exception as e:
+            logger.warning("초안 미리 만들기 실패 (%s/%s): %s", uid, acc_name, e)
+            # 요청 한도 초과는 다음 차례에 다시 시도, 그 밖의 오류(키 오류 등)는 화면에 보여 줌
+            if not _is_rate_limited(e):
+                pool.put(uid, acc_name, slot, slot_at, topic, error=str(e)[:300])
+        else:
+            pool.put(uid, acc_name, slot, slot_at, topic, text=text)
+    return True
+
+def prefetch_drafts(users=None, now=None, quota=PREFETCH_DAILY_QUOTA, max_workers=PREFETCH_WORKERS):
+    # 한 번 돌면서 빈 시간대 초안을 채움. 만든(시도한) 개수를 돌려줌
+    now = now or time.time()
+    get_draft_pool().prune(now)
+    jobs = pending_jobs(users if users is not None else load_all_users(), now)
+    if not jobs:
+        return 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))), thread_name_prefix="draft-prefetch") as pool:
+        return sum(pool.map(lambda job: _prefetch_one(job, quota), jobs))
+
+def _prefetch_forever():
+    while True:
+        try:
+            made = prefetch_drafts()
+            if made: logger.info("초안 %d개 미리 만듦", made)
+        except Exception:
+            logger.exception("초안 미리 만들기 중 오류")
+        time.sleep(PREFETCH_INTERVAL_SECONDS)
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+def start_draft_prefetcher():
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = threading.Thread(target=_prefetch_forever, name="draft-prefetch", daemon=True)
+            _prefetcher.start()
+    return _prefetcher
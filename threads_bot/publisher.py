@@ -0,0 +1,258 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import http_client
+from .metrics import CONTAINER_WAIT_SECONDS, THREADS_API_SECONDS, timer
+
+# 벤치마크/개발 중에는 로컬 가짜 서버로 바꿔 쓸 수 있음
+GRAPH_URL = os.environ.get("THREADS_BOT_GRAPH_URL", "https://graph.threads.net/v1.0")
+TOKEN_URL = os.environ.get("THREADS_BOT_TOKEN_URL", "https://graph.threads.net")
+
+# 컨테이너 상태 확인 간격: 짧게 시작해서 조금씩 늘림 (0.25초 → 최대 2초)
+POLL_INITIAL_DELAY = 0.25
+POLL_MAX_DELAY = 2.0
+POLL_BACKOFF = 1.5
+# 이 시간 안에 컨테이너가 준비되지 않으면 실패 처리
+CONTAINER_TIMEOUT = 60
+# 잠깐 기다렸다 다시 하면 되는 Graph API 오류 코드 (일시적 장애, 호출 한도 초과)
+TRANSIENT_ERROR_CODES = {1, 2, 4, 17, 32, 341, 613}
+# 게시물 종류. 캐러셀은 이미지 2~20장 (스레드 API 제한)
+MEDIA_TYPES = ("TEXT", "IMAGE", "CAROUSEL")
+CAROUSEL_MIN_ITEMS = 2
+CAROUSEL_MAX_ITEMS = 20
+# 캐러셀 이미지(자식 컨테이너)를 동시에 만들고 기다리는 개수
+CHILD_WORKERS = int(os.environ.get("THREADS_BOT_CHILD_WORKERS", str(CAROUSEL_MAX_ITEMS)))
+
+# ---------------------------------------------
+# 🚦 오류 분류 (일시적 / 영구적)
+# ---------------------------------------------
+class PublishError(str):
+    # 지금까지처럼 에러 메시지 문자열로 쓰면서, 다시 시도해도 되는 오류인지도 같이 들고 다님
+    def __new__(cls, message, transient=False):
+        obj = super().__new__(cls, message)
+        obj.transient = transient
+        return obj
+
+def is_transient(msg):
+    return getattr(msg, "transient", False)
+
+def _response_error(prefix, res):
+    # 429 / 5xx / Graph API 가 is_transient 로 표시하거나 한도 초과 코드를 준 경우만 일시적 오류
+    transient = res.status_code == 429 or res.status_code >= 500
+    try:
+        error = res.json().get("error") or {}
+    except ValueError:
+        error = {}
+    if isinstance(error, dict) and (error.get("is_transient") or error.get("code") in TRANSIENT_ERROR_CODES):
+        transient = True
+    return PublishError(f"{prefix}: {res.text}", transient)
+
+def _network_error(prefix, e, idempotent=True):
+    # 응답을 못 받은 경우: 요청이 다시 보내도 되는 것이거나 서버에 닿지 않았을 때만 재시도
+    return PublishError(f"{prefix}: {e}", idempotent or not e.request_sent)
+
+# ---------------------------------------------
+# 🖼️ 게시물 종류 (글 / 이미지 / 캐러셀)
+# ---------------------------------------------
+def normalize_media(media_type=None, media_urls=None):
+    # (종류, 이미지 주소 목록) 검사. 종류를 안 주면 주소 개수로 정함 (0개 글, 1개 이미지, 여러 개 캐러셀)
+    urls = [str(u).strip() for u in (media_urls or []) if u and str(u).strip()]
+    if not media_type:
+        media_type = "TEXT" if not urls else "IMAGE" if len(urls) == 1 else "CAROUSEL"
+    media_type = str(media_type).strip().upper()
+    if media_type not in MEDIA_TYPES:
+        raise ValueError(f"지원하지 않는 게시물 종류: {media_type}")
+    if media_type == "TEXT" and urls:
+        raise ValueError("글만 올리는 게시물에는 이미지 주소를 넣을 수 없습니다.")
+    if media_type == "IMAGE" and len(urls) != 1:
+        raise ValueError("이미지 게시물은 이미지 주소가 1개여야 합니다.")
+    if media_type == "CAROUSEL" and not CAROUSEL_MIN_ITEMS <= len(urls) <= CAROUSEL_MAX_ITEMS:
+        raise ValueError(f"캐러셀은 이미지가 {CAROUSEL_MIN_ITEMS}~{CAROUSEL_MAX_ITEMS}장이어야 합니다 (지금 {len(urls)}장).")
+    bad = next((u for u in urls if not u.startswith(("http://", "https://"))), None)
+    if bad:
+        raise ValueError(f"이미지 주소는 http(s):// 로 시작하는 공개 주소여야 합니다: {bad}")
+    return media_type, urls
+
+# ---------------------------------------------
+# 📤 스레드 API 호출
+# ---------------------------------------------
+def _request_container(fields, access_token):
+    try:
+        with timer(THREADS_API_SECONDS, phase="create"):
+            create_res = http_client.post(f"{GRAPH_URL}/me/threads", data={**fields, "access_token": access_token})
+    except http_client.HttpError as e:
+        return None, _network_error("컨테이너 생성 오류", e)
+    if create_res.status_code != 200:
+        return None, _response_error("컨테이너 생성 오류", create_res)
+    return create_res.json().get("id"), None
+
+def _create_child(image_url, access_token):
+    # 캐러셀 이미지 하나: 만들고 준비될 때까지 기다림
+    creation_id, err = _request_container({"media_type": "IMAGE", "image_url": image_url, "is_carousel_item": "true"}, access_token)
+    if creation_id is None:
+        return None, err
+    ready, err = wait_for_container(creation_id, access_token)
+    return (creation_id, None) if ready else (None, err)
+
+def _create_carousel(text, access_token, media_urls):
+    # 이미지마다 자식 컨테이너를 동시에 만들어(같은 keep-alive 연결 풀 사용) 전부 준비되면 부모 컨테이너를 만듦
+    workers = max(1, min(CHILD_WORKERS, len(media_urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="threads-child") as pool:
+        children = list(pool.map(lambda url: _create_child(url, access_token), media_urls))
+    failed = next((err for child_id, err in children if child_id is None), None)
+    if failed is not None:
+        return None, failed
+    return _request_container({"media_type": "CAROUSEL", "children": ",".join(child_id for child_id, _ in children), "text": text}, access_token)
+
+def _create_container(text, access_token, media_type="TEXT", media_urls=None):
+    if media_type == "CAROUSEL":
+        return _create_carousel(text, access_token, media_urls)
+    if media_type == "IMAGE":
+        return _request_container({"media_type": "IMAGE", "image_url": media_urls[0], "text": text}, access_token)
+    return _request_container({"media_type": "TEXT", "text": text}, access_token)
+
+def _container_status(creation_id, access_token):
+    # FINISHED 가 되면 발행 가능, ERROR/EXPIRED 면 발행 불가, 그 외(IN_PROGRESS 등)는 대기
+    try:
+        with timer(THREADS_API_SECONDS, phase="status"):
+            res = http_client.get(f"{GRAPH_URL}/{creation_id}", params={"fields": "status,error_message", "access_token": access_token})
+    except http_client.HttpError as e:
+        return None, f"상태 확인 오류: {e}"
+    if res.status_code != 200:
+        return None, f"상태 확인 오류: {res.text}"
+    try:
+        body = res.json()
+    except ValueError:
+        return None, f"상태 확인 오류 (JSON 아님): {res.text[:200]}"
+    return body.get("status"), body.get("error_message")
+
+def _publish_container(creation_id, access_token):
+    try:
+        with timer(THREADS_API_SECONDS, phase="publish"):
+            publish_res = http_client.post(f"{GRAPH_URL}/me/threads_publish", data={"creation_id": creation_id, "access_token": access_token})
+    except http_client.HttpError as e:
+        # 발행 요청이 서버에 닿았다면 이미 올라갔을 수도 있으니 중복 게시를 막기 위해 재시도하지 않음
+        return False, _network_error("발행 오류", e, idempotent=False)
+    if publish_res.status_code != 200:
+        return False, _response_error("발행 오류", publish_res)
+    # 성공하면 메시지 대신 올라간 게시물의 미디어 ID
+    return True, publish_res.json().get("id") or "성공"
+
+def _check_ready(creation_id, access_token):
+    # (True, None): 준비 완료 / (False, 메시지): 발행 불가 / (None, None): 아직 처리 중
+    # (None, 메시지): 이번 상태 확인이 실패함 (네트워크 오류 등, 다음에 다시 확인)
+    status, err = _container_status(creation_id, access_token)
+    if status == "FINISHED":
+        return True, None
+    if status == "ERROR":
+        return False, PublishError(f"컨테이너 처리 오류: {err or status}")
+    if status == "EXPIRED":
+        # 만들어 둔 컨테이너가 너무 오래되어 만료된 것: 새로 만들면 됨
+        return False, PublishError(f"컨테이너 처리 오류: {err or status}", transient=True)
+    return None, (None if status else err)
+
+def _timeout_error(last_err):
+    # 기다리는 동안 상태 확인이 실패했었다면 마지막 오류를 같이 남김 (연결 장애가 "시간 초과"로만 보이지 않도록)
+    message = "컨테이너 준비 시간 초과"
+    return PublishError(f"{message} (마지막 {last_err})" if last_err else message, transient=True)
+
+def wait_for_container(creation_id, access_token, timeout=CONTAINER_TIMEOUT):
+    delay = POLL_INITIAL_DELAY
+    deadline = time.monotonic() + timeout
+    last_err = None
+    while True:
+        ready, err = _check_ready(creation_id, access_token)
+        if ready is not None:
+            return ready, err
+        last_err = err or last_err
+        if time.monotonic() + delay > deadline:
+            return False, _timeout_error(last_err)
+        time.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+
+def _publish_when_ready(creation_id, access_token):
+    with timer(CONTAINER_WAIT_SECONDS):
+        ready, err = wait_for_container(creation_id, access_token)
+    if not ready:
+        return False, err
+    return _publish_container(creation_id, access_token)
+
+def post_to_threads(text, access_token, media_type="TEXT", media_urls=None):
+    creation_id, err = _create_container(text, access_token, media_type, media_urls)
+    if creation_id is None:
+        return False, err
+    return _publish_when_ready(creation_id, access_token)
+
+def post_batch_to_threads(posts, ordered=True, on_result=None):
+    # posts: [(text, access_token), ...] 또는 이미지/캐러셀이면 [(text, access_token, media_type, media_urls), ...]
+    # 1단계에서 컨테이너를 전부 먼저 만들어 두고, 2단계에서 준비된 것부터 발행한다.
+    # ordered=True 면 목록 순서대로 발행 (앞 글을 기다리는 동안 뒤 글들도 서버에서 준비됨).
+    results = [None] * len(posts)
+
+    def finish(i, result):
+        results[i] = result
+        if on_result is not None:
+            on_result(i, *result)
+
+    pending = []
+    for i, post in enumerate(posts):
+        creation_id, err = _create_container(*post)
+        if creation_id is None:
+            finish(i, (False, err))
+        else:
+            pending.append((i, creation_id, post[1]))
+
+    if ordered:
+        for i, creation_id, access_token in pending:
+            finish(i, _publish_when_ready(creation_id, access_token))
+        return results
+
+    delay = POLL_INITIAL_DELAY
+    deadline = time.monotonic() + CONTAINER_TIMEOUT
+    last_errs = {}
+    while pending:
+        waiting = []
+        for i, creation_id, access_token in pending:
+            ready, err = _check_ready(creation_id, access_token)
+            if ready:
+                finish(i, _publish_container(creation_id, access_token))
+            elif ready is False:
+                finish(i, (False, err))
+            else:
+                if err: last_errs[i] = err
+                waiting.append((i, creation_id, access_token))
+        pending = waiting
+        if not pending:
+            break
+        if time.monotonic() + delay > deadline:
+            for i, _, _ in pending:
+                finish(i, (False, _timeout_error(last_errs.get(i))))
+            break
+        time.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+    return results
+
+def _token_request(path, params):
+    try:
+        with timer(THREADS_API_SECONDS, phase="token"):
+            res = http_client.get(f"{TOKEN_URL}/{path}", params=params)
+    except http_client.HttpError as e:
+        return False, str(e)
+    if res.status_code != 200:
+        return False, res.text
+    return True, res.json()
+
+def exchange_long_lived_token(short_token, client_secret):
+    # 단기 토큰 → 60일 장기 토큰. 성공하면 (True, {"access_token", "expires_in", ...})
+    params = {"grant_type": "th_exchange_token", "client_secret": client_secret, "access_token": short_token}
+    return _token_request("access_token", params)
+
+def refresh_long_lived_token(long_token):
+    # 아직 유효한 장기 토큰의 만료일을 다시 60일 뒤로 연장
+    params = {"grant_type": "th_refresh_token", "access_token": long_token}
+    return _token_request("refresh_access_token", params)
+
+def get_long_lived_token(short_token, client_secret):
+    ok, body = exchange_long_lived_token(short_token, client_secret)
+    return (True, body.get("access_token")) if ok else (False, body)
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import threading
+import time
+
+from .schedule_store import SCHEDULE_DB
+
+# 계정당 발행 속도 (토큰 버킷): 분당 RATE_PER_MINUTE 개씩 채워지고 최대 BURST 개까지 모아 둠
+RATE_PER_MINUTE = float(os.environ.get("THREADS_BOT_RATE_PER_MINUTE", "6"))
+BURST = float(os.environ.get("THREADS_BOT_RATE_BURST", "3"))
+# 스레드 API 발행 한도: 계정당 24시간에 250개
+DAILY_CAP = int(os.environ.get("THREADS_BOT_DAILY_CAP", "250"))
+DAY_SECONDS = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    user TEXT NOT NULL,
+    account_name TEXT NOT NULL,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user, account_name)
+);
+CREATE TABLE IF NOT EXISTS rate_events (
+    user TEXT NOT NULL,
+    account_name TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rate_events_account_at ON rate_events(user, account_name, at);
+"""
+
+# ---------------------------------------------
+# 🚦 계정별 발행 속도 제한 (토큰 버킷 + 24시간 한도)
+# ---------------------------------------------
+class RateLimiter:
+    # 상태는 예약 DB에 같이 두어서, 같은 DB를 쓰는 모든 프로세스/서버가 한 계정의 한도를 나눠 씀
+    def __init__(self, path=SCHEDULE_DB, rate_per_minute=RATE_PER_MINUTE, burst=BURST, daily_cap=DAILY_CAP):
+        self.path = path
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1.0, burst)
+        self.daily_cap = daily_cap
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @property
+    def interval(self):
+        # 버킷이 비었을 때 한 개씩 나가는 간격 (초)
+        return 1.0 / self.rate
+
+    def acquire(self, user, account_name, now=None):
+        # 지금 보내도 되면 한 칸을 쓰고 0 을, 아니면 다음 자리가 날 때까지 남은 초를 돌려줌
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            wait = self._take(conn, user, account_name, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _take(self, conn, user, account_name, now):
+        conn.execute("DELETE FROM rate_events WHERE user = ? AND account_name = ? AND at <= ?",
+                     (user, account_name, now - DAY_SECONDS))
+        used, oldest = conn.execute("SELECT COUNT(*), MIN(at) FROM rate_events WHERE user = ? AND account_name = ?",
+                                    (user, account_name)).fetchone()
+        if used >= self.daily_cap:
+            return oldest + DAY_SECONDS - now
+
+        row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE user = ? AND account_name = ?",
+                           (user, account_name)).fetchone()
+        tokens = self.burst if row is None else min(self.burst, row["tokens"] + (now - row["updated_at"]) * self.rate)
+        if tokens < 1:
+            return (1 - tokens) / self.rate
+
+        conn.execute("INSERT OR REPLACE INTO rate_buckets (user, account_name, tokens, updated_at) VALUES (?, ?, ?, ?)",
+                     (user, account_name, tokens - 1, now))
+        conn.execute("INSERT INTO rate_events (user, account_name, at) VALUES (?, ?, ?)", (user, account_name, now))
+        return 0.0
+
+    def used_today(self, user, account_name, now=None):
+        now = time.time() if now is None else now
+        return self._conn().execute("SELECT COUNT(*) FROM rate_events WHERE user = ? AND account_name = ? AND at > ?",
+                                    (user, account_name, now - DAY_SECONDS)).fetchone()[0]
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
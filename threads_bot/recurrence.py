@@ -0,0 +1,81 @@
+import json
+from datetime import datetime, timedelta
+
+WEEKDAY_NAMES = "월화수목금토일"
+
+# ---------------------------------------------
+# 🔁 반복 예약 규칙
+# ---------------------------------------------
+# 규칙은 예약 한 줄에 JSON 으로 저장하고, 다음 회차는 발행이 끝난 뒤에만 하나씩 계산한다.
+#   {"every_days": 3}                 3일마다
+#   {"weekdays": [0, 2, 4]}           매주 월/수/금 (0 = 월요일)
+#   + "until": "YYYY-MM-DD"           이 날짜까지
+#   + "count": 10                     총 10회까지
+def normalize_rule(rule):
+    if not rule:
+        return None
+    if isinstance(rule, str):
+        rule = json.loads(rule)
+    clean = {}
+    if rule.get("weekdays"):
+        days = sorted({int(d) for d in rule["weekdays"]})
+        if any(d < 0 or d > 6 for d in days):
+            raise ValueError("요일은 0(월)~6(일) 사이여야 합니다.")
+        clean["weekdays"] = days
+    elif rule.get("every_days"):
+        every = int(rule["every_days"])
+        if every < 1:
+            raise ValueError("반복 간격은 1일 이상이어야 합니다.")
+        clean["every_days"] = every
+    else:
+        raise ValueError("반복 간격(every_days)이나 요일(weekdays)이 필요합니다.")
+    if rule.get("until"):
+        clean["until"] = datetime.strptime(str(rule["until"]), "%Y-%m-%d").strftime("%Y-%m-%d")
+    if rule.get("count"):
+        count = int(rule["count"])
+        if count < 1:
+            raise ValueError("반복 횟수는 1 이상이어야 합니다.")
+        clean["count"] = count
+    return clean
+
+def dump_rule(rule):
+    rule = normalize_rule(rule)
+    return json.dumps(rule, separators=(",", ":")) if rule else None
+
+def load_rule(text):
+    return json.loads(text) if text else None
+
+def next_occurrence(rule, last, occurrences, after=None):
+    # last: 방금 끝난 회차의 예약 시각, occurrences: 그 회차까지 포함한 진행 횟수
+    # after 이전의 회차는 건너뜀 (서버가 오래 멈춰 있었어도 밀린 회차를 한꺼번에 올리지 않음)
+    if rule is None:
+        return None
+    if rule.get("count") and occurrences >= rule["count"]:
+        return None
+    after = max(last, after or last)
+    if "every_days" in rule:
+        step = timedelta(days=rule["every_days"])
+        candidate = last + step * ((after - last) // step + 1)
+    else:
+        # 같은 시각으로 after 다음 날짜부터 요일이 맞는 날을 찾음 (최대 7일)
+        candidate = datetime.combine(after.date(), last.time())
+        if candidate <= after:
+            candidate += timedelta(days=1)
+        while candidate.weekday() not in rule["weekdays"]:
+            candidate += timedelta(days=1)
+    if rule.get("until") and candidate.date() > datetime.strptime(rule["until"], "%Y-%m-%d").date():
+        return None
+    return candidate
+
+def describe(rule, occurrences=0):
+    if not rule:
+        return ""
+    if "weekdays" in rule:
+        text = "매일" if len(rule["weekdays"]) == 7 else "매주 " + "·".join(WEEKDAY_NAMES[d] for d in rule["weekdays"])
+    else:
+        text = "매일" if rule["every_days"] == 1 else f"{rule['every_days']}일마다"
+    if rule.get("count"):
+        text += f" ({occurrences}/{rule['count']}회)"
+    if rule.get("until"):
+        text += f" ~{rule['until']}"
+    return text
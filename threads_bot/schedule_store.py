@@ -0,0 +1,404 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from .metrics import STORAGE_SECONDS, timer
+
+SCHEDULE_DB = "scheduled.db"
+# 예전 버전이 쓰던 파일. 처음 한 번만 DB로 옮기고 .migrated 로 이름을 바꿔 둔다.
+LEGACY_SCHEDULE_FILE = "scheduled.json"
+
+# 화면/가져오기 파일에서 쓰는 예약 시각 형식 (한국 시간). DB에는 epoch 초로 저장한다.
+POST_TIME_FORMAT = "%Y-%m-%d %H:%M"
+KST = timezone(timedelta(hours=9))
+
+def to_post_ts(post_time):
+    return datetime.strptime(post_time, POST_TIME_FORMAT).replace(tzinfo=KST).timestamp()
+
+def to_post_time(post_ts):
+    return datetime.fromtimestamp(post_ts, KST).strftime(POST_TIME_FORMAT)
+
+def _to_post_ts_or_none(post_time):
+    try:
+        return to_post_ts(str(post_time).strip())
+    except (TypeError, ValueError):
+        return None
+
+# 예약 한 줄에는 계정 번호만 두고, 사용자/계정 이름은 accounts 에 한 번만 저장한다.
+# 토큰은 저장하지 않고 발행 직전에 사용자 파일(threads_accounts)에서 찾는다.
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user TEXT NOT NULL,
+        account_name TEXT NOT NULL,
+        UNIQUE (user, account_name)
+    )""",
+    """CREATE TABLE IF NOT EXISTS schedules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER NOT NULL REFERENCES accounts(id),
+        text TEXT NOT NULL,
+        post_ts REAL NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        error_msg TEXT,
+        lease_owner TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL,
+        recurrence TEXT,
+        occurrences INTEGER NOT NULL DEFAULT 0,
+        media_type TEXT,
+        media_urls TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_schedules_status_ts ON schedules(status, post_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_schedules_account_ts ON schedules(account_id, post_ts)",
+    # 재시도/한도로 미룬 줄만 (대부분의 줄은 NULL 이라 작음)
+    "CREATE INDEX IF NOT EXISTS idx_schedules_next_attempt ON schedules(next_attempt_at) WHERE next_attempt_at IS NOT NULL",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+_COLUMNS = ("account_id", "text", "post_ts", "status", "error_msg", "attempts", "next_attempt_at", "recurrence", "occurrences",
+            "media_type", "media_urls")
+
+# ---------------------------------------------
+# 🗄️ 예약 게시물 저장소 (SQLite)
+# ---------------------------------------------
+class ScheduleStore:
+    # 전체 파일을 읽고 다시 쓰는 대신, 한 줄씩 추가/수정/삭제하고
+    # (status, post_ts) / (account_id, post_ts) 인덱스로 필요한 줄만 조회한다.
+    # 밖으로는 예전처럼 user / account_name / post_time(문자열)이 들어 있는 dict 를 돌려준다.
+    def __init__(self, path=SCHEDULE_DB, legacy_file=LEGACY_SCHEDULE_FILE):
+        self.path = path
+        self.legacy_file = legacy_file
+        self._local = threading.local()
+        self._accounts = {}  # 계정 번호 → (user, account_name)
+        self._account_ids = {}  # (user, account_name) → 계정 번호
+        self._create_schema()
+        self._migrate_legacy_json()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 스레드마다 연결을 따로 두고, 쓰기 트랜잭션은 필요한 곳에서만 직접 연다
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _migrate_legacy_json(self):
+        if not os.path.exists(self.legacy_file):
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'legacy_json_migrated'").fetchone()
+            if done is None:
+                try:
+                    with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                        legacy = json.load(f)
+                except (OSError, ValueError):
+                    legacy = []
+                rows = []
+                for s in legacy:
+                    # 예전 파일의 processing 상태는 불러올 때마다 지워지던 값이라 대기 상태로 옮긴다
+                    status = "failed" if s.get("status") == "failed" else "pending"
+                    error_msg = s.get("error_msg")
+                    post_ts = _to_post_ts_or_none(s.get("post_time", ""))
+                    if post_ts is None:
+                        status, error_msg, post_ts = "failed", f"예약 시각을 읽을 수 없습니다: {s.get('post_time')}", 0
+                    account_id = self._account_id(conn, s.get("user", ""), s.get("account_name", "기본 계정"))
+                    rows.append((account_id, s.get("text", ""), post_ts, status, error_msg))
+                conn.executemany("INSERT INTO schedules (account_id, text, post_ts, status, error_msg) VALUES (?, ?, ?, ?, ?)", rows)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_json_migrated', ?)", (str(len(rows)),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            self._forget_accounts()
+            raise
+        try:
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        except FileNotFoundError:
+            pass  # 다른 프로세스가 먼저 옮김
+
+    # ---- 계정 번호 ----
+    def _account_id(self, conn, user, account_name):
+        # 쓰기 트랜잭션 안에서 호출 (없으면 새 번호를 만듦)
+        account_id = self._account_ids.get((user, account_name))
+        if account_id is None:
+            conn.execute("INSERT OR IGNORE INTO accounts (user, account_name) VALUES (?, ?)", (user, account_name))
+            account_id = conn.execute("SELECT id FROM accounts WHERE user = ? AND account_name = ?",
+                                      (user, account_name)).fetchone()[0]
+            self._remember_account(account_id, user, account_name)
+        return account_id
+
+    def _remember_account(self, account_id, user, account_name):
+        self._accounts[account_id] = (user, account_name)
+        self._account_ids[(user, account_name)] = account_id
+
+    def _forget_accounts(self):
+        # 트랜잭션이 취소되면 그 안에서 만든 번호도 없던 일이 되므로 다시 읽게 함
+        self._accounts = {}
+        self._account_ids = {}
+
+    def _load_new_accounts(self):
+        # 다른 프로세스가 만든 계정 번호까지 맞춰 둠 (계정 줄은 지우지 않으므로 새 번호만 확인)
+        known = max(self._accounts, default=0)
+        for r in self._conn().execute("SELECT id, user, account_name FROM accounts WHERE id > ?", (known,)):
+            self._remember_account(r["id"], r["user"], r["account_name"])
+
+    def _account(self, account_id):
+        account = self._accounts.get(account_id)
+        if account is None:
+            self._load_new_accounts()
+            account = self._accounts.get(account_id, ("", ""))
+        return account
+
+    def _user_account_ids(self, user, account_names=None):
+        self._load_new_accounts()
+        return [i for i, (u, name) in list(self._accounts.items()) if u == user and (not account_names or name in account_names)]
+
+    def _as_dict(self, record):
+        data = dict(record)
+        data["user"], data["account_name"] = self._account(data["account_id"])
+        data["post_time"] = to_post_time(data["post_ts"])
+        data["media_type"] = data["media_type"] or "TEXT"
+        data["media_urls"] = json.loads(data["media_urls"]) if data["media_urls"] else []
+        return data
+
+    def _media_fields(self, fields):
+        # 글만 있는 예약은 두 열 모두 NULL, 이미지 주소 목록은 JSON 문자열로
+        if "media_type" in fields and fields["media_type"] == "TEXT":
+            fields["media_type"] = None
+        if "media_urls" in fields and not isinstance(fields["media_urls"], (str, type(None))):
+            fields["media_urls"] = json.dumps(list(fields["media_urls"]), ensure_ascii=False) if fields["media_urls"] else None
+        return fields
+
+    def _fields(self, conn, item):
+        # 화면/가져오기 쪽 dict(user, account_name, post_time 문자열)를 DB 열 값으로
+        fields = {k: item[k] for k in _COLUMNS if item.get(k) is not None}
+        if "account_id" not in fields:
+            fields["account_id"] = self._account_id(conn, item["user"], item["account_name"])
+        if "post_ts" not in fields:
+            fields["post_ts"] = to_post_ts(item["post_time"])
+        return {k: v for k, v in self._media_fields(fields).items() if v is not None}
+
+    def _update_fields(self, fields):
+        fields = dict(fields)
+        if "post_time" in fields:
+            fields["post_ts"] = to_post_ts(fields.pop("post_time"))
+        unknown = set(fields) - set(_COLUMNS)
+        if unknown:
+            raise ValueError(f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+        return self._media_fields(fields)
+
+    def version(self):
+        # 다른 연결(다른 스레드/프로세스)이 커밋할 때마다 바뀌는 값
+        return self._conn().execute("PRAGMA data_version").fetchone()[0]
+
+    def _rows_by_id(self, conn, ids):
+        # id 목록의 지금 행 (지워진 id 는 None)
+        rows = dict.fromkeys(ids)
+        ids = list(rows)
+        for n in range(0, len(ids), 500):
+            chunk = ids[n:n + 500]
+            for row in conn.execute(f"SELECT * FROM schedules WHERE id IN ({', '.join('?' * len(chunk))})", chunk):
+                rows[row["id"]] = row
+        return rows
+
+    def _transaction(self, work):
+        # work(conn) 을 쓰기 트랜잭션 하나에서 실행하고 그 결과를 돌려줌
+        conn = self._conn()
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            self._forget_accounts()
+            raise
+        STORAGE_SECONDS.observe(time.perf_counter() - started, op="schedule_write")
+        return result
+
+    def _write(self, sql, params):
+        # 바뀐 행 수
+        return self._transaction(lambda conn: conn.execute(sql, params).rowcount)
+
+    def _insert(self, conn, item):
+        fields = self._fields(conn, item)
+        cols = ", ".join(fields)
+        marks = ", ".join("?" for _ in fields)
+        return conn.execute(f"INSERT INTO schedules ({cols}) VALUES ({marks})", tuple(fields.values())).lastrowid
+
+    def add(self, item):
+        return self._transaction(lambda conn: self._insert(conn, item))
+
+    def add_many(self, items):
+        # 여러 건을 한 트랜잭션으로 추가 (일괄 가져오기용)
+        return self._transaction(lambda conn: [self._insert(conn, item) for item in items])
+
+    # ---- 화면에서의 수정/취소: 발행 중(processing)인 줄은 건드리지 않음 ----
+    def edit(self, schedule_id, **fields):
+        fields = self._update_fields(fields)
+        if not fields:
+            return False
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        return self._write(f"UPDATE schedules SET {assignments} WHERE id = ? AND status != 'processing'",
+                           (*fields.values(), schedule_id)) > 0
+
+    def cancel(self, schedule_id):
+        return self._write("DELETE FROM schedules WHERE id = ? AND status != 'processing'", (schedule_id,)) > 0
+
+    # ---- 발행 워커용 임대(lease): 여러 프로세스/서버가 같은 큐를 나눠 처리 ----
+    def claim_due(self, now, owner, lease_seconds, limit=None, per_account=None):
+        # 시간이 된 대기/재시도 항목(발행 한도나 재시도로 미뤄졌으면 그 시각 이후), 임대가 만료된(주인이 죽은) 처리 중 항목을 한 트랜잭션에서 가져감
+        # per_account: 계정마다 앞에서부터 이 개수까지만 (발행 한도만큼만 가져가서 밀린 줄을 통째로 잡았다 놓지 않도록)
+        expires = now + lease_seconds
+
+        def work(conn):
+            due = ("(status IN ('pending', 'retrying') AND post_ts <= ? AND COALESCE(next_attempt_at, 0) <= ?)"
+                   " OR (status = 'processing' AND COALESCE(lease_expires, 0) < ?)")
+            params = [now, now, now]
+            if per_account is None:
+                sql = f"SELECT id FROM schedules WHERE {due} ORDER BY post_ts, id"
+            else:
+                sql = ("SELECT id FROM (SELECT id, post_ts, ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY post_ts, id) AS n"
+                       f" FROM schedules WHERE {due}) WHERE n <= ? ORDER BY post_ts, id")
+                params.append(per_account)
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            ids = [r["id"] for r in conn.execute(sql, params)]
+            for schedule_id in ids:
+                conn.execute("UPDATE schedules SET status = 'processing', lease_owner = ?, lease_expires = ? WHERE id = ?",
+                             (owner, expires, schedule_id))
+            # 가져간 행은 같은 트랜잭션에서 다시 읽어 돌려줌
+            rows = self._rows_by_id(conn, ids)
+            return [rows[i] for i in ids if rows[i] is not None]
+
+        return [self._as_dict(row) for row in self._transaction(work)]
+
+    def renew_leases(self, schedule_ids, owner, lease_seconds):
+        expires = time.time() + lease_seconds
+
+        def work(conn):
+            changed = 0
+            for schedule_id in schedule_ids:
+                changed += conn.execute(
+                    "UPDATE schedules SET lease_expires = ? WHERE id = ? AND status = 'processing' AND lease_owner = ?",
+                    (expires, schedule_id, owner)).rowcount
+            return changed
+
+        return self._transaction(work)
+
+    def complete(self, schedule_id, owner):
+        return self._write("DELETE FROM schedules WHERE id = ? AND lease_owner = ?", (schedule_id, owner)) > 0
+
+    def release(self, schedule_id, owner, **fields):
+        # 임대를 풀면서 결과(실패 사유 등)를 기록
+        fields = self._update_fields(fields)
+        assignments = "".join(f"{k} = ?, " for k in fields)
+        return self._write(
+            f"UPDATE schedules SET {assignments}lease_owner = NULL, lease_expires = NULL WHERE id = ? AND lease_owner = ?",
+            (*fields.values(), schedule_id, owner)) > 0
+
+    def release_many(self, owner, releases):
+        # releases: [(id, {필드: 값}), ...] 여러 줄의 임대를 한 트랜잭션으로 풀어 줌
+        releases = [(schedule_id, self._update_fields(fields)) for schedule_id, fields in releases]
+
+        def work(conn):
+            changed = 0
+            for schedule_id, fields in releases:
+                assignments = "".join(f"{k} = ?, " for k in fields)
+                changed += conn.execute(
+                    f"UPDATE schedules SET {assignments}lease_owner = NULL, lease_expires = NULL WHERE id = ? AND lease_owner = ?",
+                    (*fields.values(), schedule_id, owner)).rowcount
+            return changed
+
+        if not releases:
+            return 0
+        return self._transaction(work)
+
+    def defer_due(self, user, account_name, now, until):
+        # 이 계정에서 시간이 된 대기/재시도 줄(아무도 안 잡은 것)을 until 까지 한 번에 미룸
+        # (발행 한도가 다 찬 계정의 밀린 줄이 계속 "지금 할 일"로 남아 스케줄러가 헛돌지 않도록)
+        account_ids = self._user_account_ids(user, [account_name])
+        if not account_ids:
+            return 0
+        due = ("account_id = ? AND status IN ('pending', 'retrying') AND post_ts <= ? AND COALESCE(next_attempt_at, 0) <= ?")
+        params = (account_ids[0], now, now)
+
+        return self._write(f"UPDATE schedules SET next_attempt_at = ? WHERE {due}", (until, *params))
+
+    def query(self, user, account_names=None, statuses=None, start=None, end=None, limit=20, offset=0):
+        # 예약 관리 화면용: 조건에 맞는 한 페이지와 전체 건수를 돌려줌 ((account_id, post_ts) 인덱스 사용)
+        # start / end 는 "YYYY-MM-DD HH:MM" (한국 시간)
+        account_ids = self._user_account_ids(user, account_names)
+        if not account_ids:
+            return [], 0
+        where = [f"account_id IN ({', '.join('?' for _ in account_ids)})"]
+        params = list(account_ids)
+        if statuses:
+            where.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if start is not None:
+            where.append("post_ts >= ?")
+            params.append(to_post_ts(start))
+        if end is not None:
+            where.append("post_ts <= ?")
+            params.append(to_post_ts(end))
+        clause = " AND ".join(where)
+        conn = self._conn()
+        with timer(STORAGE_SECONDS, op="schedule_query"):
+            total = conn.execute(f"SELECT COUNT(*) FROM schedules WHERE {clause}", params).fetchone()[0]
+            rows = conn.execute(f"SELECT * FROM schedules WHERE {clause} ORDER BY post_ts, id LIMIT ? OFFSET ?",
+                                (*params, limit, offset)).fetchall()
+        return [self._as_dict(r) for r in rows], total
+
+    def next_due_at(self):
+        # 다음에 claim_due 가 가져갈 것이 생기는 가장 이른 시각(epoch, 없으면 None). 인덱스로 몇 줄만 읽음:
+        # 바로 올릴 대기 줄은 (status, post_ts) 순서의 첫 줄, 재시도/미룬 줄은 next_attempt_at 인덱스,
+        # 다른 워커가 잡고 있는(죽었을 수도 있는) 줄은 임대가 끝나는 시각
+        row = self._conn().execute(
+            "SELECT MIN(t) FROM ("
+            " SELECT * FROM (SELECT post_ts AS t FROM schedules WHERE status = 'pending' AND next_attempt_at IS NULL"
+            "  ORDER BY post_ts LIMIT 1)"
+            " UNION ALL SELECT MIN(MAX(post_ts, next_attempt_at)) FROM schedules"
+            "  WHERE next_attempt_at IS NOT NULL AND +status IN ('pending', 'retrying')"
+            " UNION ALL SELECT MIN(COALESCE(lease_expires, 0)) FROM schedules WHERE status = 'processing')").fetchone()
+        return row[0]
+
+    def count_by_status(self):
+        rows = self._conn().execute("SELECT status, COUNT(*) AS n FROM schedules GROUP BY status")
+        return {r["status"]: r["n"] for r in rows}
+
+    def count(self, status=None):
+        if status is None:
+            return self._conn().execute("SELECT COUNT(*) FROM schedules").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM schedules WHERE status = ?", (status,)).fetchone()[0]
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_schedule_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ScheduleStore()
+    return _store
@@ -0,0 +1,324 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from .history import get_publish_history
+from .schedule_store import POST_TIME_FORMAT, get_schedule_store
+from .publisher import PublishError, is_transient, post_batch_to_threads, post_to_threads
+from .ratelimit import get_rate_limiter
+from .recurrence import load_rule, next_occurrence
+from .metrics import POSTS_DEFERRED, POSTS_FAILED, POSTS_PUBLISHED, PUBLISH_LAG_SECONDS, QUEUE_DEPTH, start_metrics_exporter
+from .prefetch import start_draft_prefetcher
+from .storage import load_account
+from .tokens import start_token_renewer
+
+logger = logging.getLogger(__name__)
+
+# 다른 프로세스(다른 서버, 수동 편집)가 DB를 바꿨을 수도 있으니 최대 이 간격으로는 다시 확인
+RESCAN_SECONDS = 60
+# 따로 띄운 스케줄러(THREADS_BOT_SCHEDULER=external)는 화면에서 예약을 추가/수정해도 notify 를 받지 못하므로
+# 이 간격마다 DB가 바뀌었는지(PRAGMA data_version) 확인함. 화면에서 앞당긴 예약은 최대 이만큼 늦게 올라감
+EXTERNAL_POLL_SECONDS = float(os.environ.get("THREADS_BOT_POLL_SECONDS", "2"))
+# 상태별 예약 개수(지표)를 다시 세는 간격
+QUEUE_DEPTH_INTERVAL = 15
+# 동시에 발행할 계정 수 (계정 안에서는 항상 순서대로 1개씩)
+PUBLISH_WORKERS = int(os.environ.get("THREADS_BOT_PUBLISH_WORKERS", "8"))
+# 발행 도중 예외가 나면 같은 항목으로 바로 재진입하지 않도록 잠깐 쉼
+ERROR_BACKOFF_SECONDS = 5
+# 발행을 맡은 워커가 이 시간 안에 연장하지 않으면(죽었으면) 다른 워커가 다시 가져감
+LEASE_SECONDS = int(os.environ.get("THREADS_BOT_LEASE_SECONDS", "120"))
+# 일시적 오류(5xx, 호출 한도, 타임아웃)는 이 횟수까지 자동으로 다시 시도 (첫 시도 포함)
+RETRY_MAX_ATTEMPTS = int(os.environ.get("THREADS_BOT_RETRY_ATTEMPTS", "5"))
+# 재시도 간격: 30초에서 두 배씩, 최대 1시간 (+ 지터)
+RETRY_BASE_SECONDS = float(os.environ.get("THREADS_BOT_RETRY_BASE_SECONDS", "30"))
+RETRY_MAX_SECONDS = float(os.environ.get("THREADS_BOT_RETRY_MAX_SECONDS", "3600"))
+# 이 프로세스를 구분하는 임대 주인 이름
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def kst_now():
+    return datetime.utcnow() + timedelta(hours=9)
+
+# ---------------------------------------------
+# ⏰ 예약 시간이 지난 게시물 발행
+# ---------------------------------------------
+class _LeaseKeeper:
+    # 발행 중인 항목의 임대를 주기적으로 연장해서, 오래 걸려도 다른 워커가 가져가지 않게 함
+    def __init__(self, owner, ids):
+        self.owner = owner
+        self._ids = set(ids)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="threads-lease", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def discard(self, schedule_id):
+        with self._lock:
+            self._ids.discard(schedule_id)
+
+    def _run(self):
+        while not self._stop.wait(LEASE_SECONDS / 3):
+            with self._lock:
+                ids = list(self._ids)
+            if ids:
+                try:
+                    get_schedule_store().renew_leases(ids, self.owner, LEASE_SECONDS)
+                except Exception:
+                    logger.exception("임대 연장 실패")
+
+def retry_delay(attempts):
+    # 지수 백오프 + 지터: 간격의 절반은 고정, 나머지 절반은 무작위
+    # (같은 장애로 한꺼번에 실패한 글들이 같은 순간에 다시 몰리지 않도록)
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def _advance_recurring(item, leases, error_msg=None):
+    # 반복 예약이면 같은 줄을 다음 회차 하나로만 옮기고 True (반복이 아니거나 끝났으면 False)
+    rule = load_rule(item.get("recurrence"))
+    if rule is None:
+        return False
+    try:
+        last = datetime.strptime(item["post_time"], POST_TIME_FORMAT)
+    except (TypeError, ValueError):
+        return False
+    occurrences = (item.get("occurrences") or 0) + 1
+    upcoming = next_occurrence(rule, last, occurrences, after=kst_now())
+    if upcoming is None:
+        return False
+    return get_schedule_store().release(item["id"], leases.owner, status="pending", post_time=upcoming.strftime(POST_TIME_FORMAT),
+                                        occurrences=occurrences, attempts=0, next_attempt_at=None, error_msg=error_msg)
+
+def _record_history(item, outcome, msg, latency, **fields):
+    # 발행 시도 한 번을 발행 기록에 남김 (큐에 넣기만 하므로 발행을 늦추지 않음)
+    get_publish_history().record(
+        item["user"], item["account_name"], outcome, text=item["text"], post_time=item.get("post_time"),
+        media_type=item.get("media_type") if item.get("media_type") not in (None, "TEXT") else None,
+        media_count=len(item.get("media_urls") or []) or None,
+        media_id=msg if outcome == "ok" else None, error=None if outcome == "ok" else str(msg),
+        latency_ms=round(latency * 1000) if latency is not None else None, **fields)
+
+def _record_result(item, success, msg, leases, latency=None):
+    # 성공하면 목록에서 지우고(반복 예약은 다음 회차로), 일시적 오류면 재시도 예약, 아니면 실패로 기록
+    # (임대를 가진 경우에만, 해당 줄만)
+    store = get_schedule_store()
+    attempts = (item.get("attempts") or 0) + 1
+    labels = {"user": item["user"], "account": item["account_name"]}
+    if success:
+        outcome = "ok"
+        if not _advance_recurring(item, leases):
+            store.complete(item["id"], leases.owner)
+        POSTS_PUBLISHED.inc(**labels)
+        PUBLISH_LAG_SECONDS.observe(max(0.0, time.time() - item["post_ts"]))
+    elif is_transient(msg) and attempts < RETRY_MAX_ATTEMPTS:
+        outcome = "retry"
+        store.release(item["id"], leases.owner, status="retrying", error_msg=msg,
+                      attempts=attempts, next_attempt_at=time.time() + retry_delay(attempts))
+        POSTS_FAILED.inc(final="false", **labels)
+    else:
+        outcome = "failed"
+        # 반복 예약은 이번 회차만 실패로 남기고 다음 회차는 계속 진행
+        if not _advance_recurring(item, leases, error_msg=f"지난 회차({item['post_time']}) 실패: {msg}"):
+            store.release(item["id"], leases.owner, status="failed", error_msg=msg, attempts=attempts, next_attempt_at=None)
+        POSTS_FAILED.inc(final="true", **labels)
+    leases.discard(item["id"])
+    _record_history(item, outcome, msg, latency, source="schedule", schedule_id=item["id"], attempt=attempts)
+
+def _reserve_slots(items, leases):
+    # 계정의 발행 한도 안에서 지금 보낼 수 있는 만큼만 남기고, 나머지는 자리가 나는 시각으로 미룸
+    # (한도를 넘겨 보냈다가 거절당해 실패로 쌓이지 않도록)
+    limiter = get_rate_limiter()
+    store = get_schedule_store()
+    now = time.time()
+    for n, item in enumerate(items):
+        wait = limiter.acquire(item["user"], item["account_name"], now)
+        if wait > 0:
+            later = items[n:]
+            store.release_many(leases.owner, [
+                (s["id"], {"status": "retrying" if s.get("attempts") else "pending", "next_attempt_at": now + wait + k * limiter.interval})
+                for k, s in enumerate(later)])
+            for s in later:
+                leases.discard(s["id"])
+            # 이번에 가져오지 않은 이 계정의 밀린 줄은 그 뒤로
+            store.defer_due(item["user"], item["account_name"], now, now + wait + len(later) * limiter.interval)
+            POSTS_DEFERRED.inc(len(items) - n, user=item["user"], account=item["account_name"])
+            return items[:n]
+    return items
+
+def _account_token(user, account_name):
+    # 예약에는 토큰을 넣어 두지 않으므로 발행 직전에 사용자 파일에서 지금 토큰을 찾음 (갱신된 토큰이 바로 쓰임)
+    acc_info = load_account(user, account_name)
+    return acc_info.get("token") if acc_info else None
+
+def _post_args(item, token):
+    # 발행 함수에 넘길 (본문, 토큰, 게시물 종류, 이미지 주소 목록)
+    return item["text"], token, item.get("media_type") or "TEXT", item.get("media_urls") or []
+
+def _publish_account_queue(items, leases):
+    # 같은 계정의 게시물은 예약 순서대로 발행 (컨테이너는 한꺼번에 미리 생성)
+    token = _account_token(items[0]["user"], items[0]["account_name"])
+    if not token:
+        for item in items:
+            _record_result(item, False, PublishError(f"[{item['account_name']}] 계정 정보(토큰)를 찾을 수 없습니다. 계정이 삭제되었는지 확인해주세요."), leases)
+        return
+    items = _reserve_slots(items, leases)
+    if not items: return
+    done = set()
+    started = time.perf_counter()
+
+    def on_result(i, success, msg):
+        done.add(i)
+        # 걸린 시간: 이 계정 묶음의 발행을 시작한 뒤 이 글이 올라가기(또는 실패하기)까지
+        _record_result(items[i], success, msg, leases, latency=time.perf_counter() - started)
+
+    try:
+        post_batch_to_threads([_post_args(item, token) for item in items], ordered=True, on_result=on_result)
+    except Exception as e:
+        for i, item in enumerate(items):
+            if i not in done:
+                _record_result(item, False, PublishError(f"발행 중 예외: {e}", transient=True), leases)
+
+def process_due_schedules(max_workers=None, owner=WORKER_ID):
+    # 시간이 된 항목을 임대와 함께 가져감 (다른 워커/서버와 겹치지 않음)
+    # 계정마다 발행 한도(한 번에 보낼 수 있는 최대 개수)만큼만 가져감
+    due_items = get_schedule_store().claim_due(time.time(), owner, LEASE_SECONDS, per_account=int(get_rate_limiter().burst))
+    if not due_items: return
+
+    # 계정별로 묶어서 계정끼리는 동시에, 계정 안에서는 순서대로 발행
+    queues = {}
+    for item in due_items:
+        queues.setdefault((item["user"], item["account_name"]), []).append(item)
+
+    workers = min(max_workers or PUBLISH_WORKERS, len(queues))
+    with _LeaseKeeper(owner, [item["id"] for item in due_items]) as leases:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="threads-publish") as pool:
+            for future in [pool.submit(_publish_account_queue, items, leases) for items in queues.values()]:
+                future.result()
+
+def publish_now(item):
+    # "지금 바로 업로드": 발행 한도 안이면 바로 보내고 (성공 여부, 메시지),
+    # 한도를 넘었으면 보내지 않고 다음 자리가 나는 시각에 발행되도록 예약해서 (None, 기다릴 초)
+    labels = {"user": item["user"], "account": item["account_name"]}
+    token = _account_token(item["user"], item["account_name"])
+    if not token:
+        message = f"[{item['account_name']}] 계정 정보(토큰)를 찾을 수 없습니다."
+        _record_history(item, "failed", message, None, source="now")
+        return False, message
+    wait = get_rate_limiter().acquire(item["user"], item["account_name"])
+    if wait > 0:
+        get_schedule_store().add({**item, "post_ts": time.time(), "next_attempt_at": time.time() + wait})
+        notify_schedules_changed()
+        POSTS_DEFERRED.inc(**labels)
+        return None, wait
+    started = time.perf_counter()
+    success, message = post_to_threads(*_post_args(item, token))
+    if success: POSTS_PUBLISHED.inc(**labels)
+    else: POSTS_FAILED.inc(final="true", **labels)
+    _record_history(item, "ok" if success else "failed", message, time.perf_counter() - started, source="now")
+    return success, message
+
+# ---------------------------------------------
+# 🕰️ 상주 스케줄러 (서버당 1개)
+# ---------------------------------------------
+class Scheduler:
+    # 가장 빠른 예약 시각(epoch)만 DB 인덱스로 물어보고 그 시간까지만 정확히 잠들었다가 깨어나서 발행한다.
+    # 예약이 추가/수정되면 notify()로 즉시 깨워서 그 시각을 다시 물어본다 (전체 목록은 읽지 않음).
+    def __init__(self, rescan_seconds=RESCAN_SECONDS):
+        self.rescan_seconds = rescan_seconds
+        self._next_at = None
+        self._depth_updated = 0.0
+        self._cond = threading.Condition()
+        self._dirty = True
+        self._stopped = False
+        self._store_version = None
+        self._thread = None
+
+    def notify(self):
+        with self._cond:
+            self._dirty = True
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="threads-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _refresh_next(self):
+        store = get_schedule_store()
+        self._store_version = store.version()
+        self._next_at = store.next_due_at()
+        # 상태별 개수는 표 전체를 세야 하므로 깨어날 때마다가 아니라 가끔만
+        if time.monotonic() - self._depth_updated >= QUEUE_DEPTH_INTERVAL:
+            self._depth_updated = time.monotonic()
+            counts = store.count_by_status()
+            for status in ("pending", "retrying", "processing", "failed"):
+                QUEUE_DEPTH.set(counts.get(status, 0), status=status)
+
+    def _seconds_until_next(self):
+        if self._next_at is None:
+            return self.rescan_seconds
+        wait = self._next_at - time.time()
+        return max(0.0, min(wait, self.rescan_seconds))
+
+    def run_forever(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                if self._dirty or get_schedule_store().version() != self._store_version:
+                    self._dirty = False
+                    self._refresh_next()
+                wait = self._seconds_until_next()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+            try:
+                process_due_schedules()
+            except Exception:
+                logger.exception("예약 게시물 처리 중 오류")
+                time.sleep(ERROR_BACKOFF_SECONDS)
+            self.notify()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def start_background_scheduler():
+    # THREADS_BOT_SCHEDULER=external 이면 페이지에서는 띄우지 않고
+    # `python -m threads_bot.scheduler` 로 따로 실행한 프로세스가 담당한다.
+    global _scheduler
+    if os.environ.get("THREADS_BOT_SCHEDULER", "embedded") == "external":
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler().start()
+            start_token_renewer()
+            start_draft_prefetcher()
+            start_metrics_exporter()
+    return _scheduler
+
+def notify_schedules_changed():
+    if _scheduler is not None:
+        _scheduler.notify()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    start_token_renewer()
+    start_draft_prefetcher()
+    start_metrics_exporter()
+    Scheduler(rescan_seconds=EXTERNAL_POLL_SECONDS).run_forever()
@@ -0,0 +1,127 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 사이 잠금 없이 프로세스 안의 잠금만 사용
+    fcntl = None
+
+from .metrics import STORAGE_SECONDS, timer
+
+SAVE_FILE = "secrets.json"
+
+# 프로세스 전체가 같이 쓰는 사용자 데이터 캐시.
+# 파일의 (수정 시각, 크기)가 그대로면 다시 읽지 않는다.
+_users_cache = {"signature": None, "data": None}
+_users_lock = threading.Lock()
+_users_migrated = False
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+# ---------------------------------------------
+# 💾 데이터 처리
+# ---------------------------------------------
+@contextmanager
+def _file_lock():
+    # 화면 서버와 따로 띄운 스케줄러(토큰 갱신)가 같은 파일을 읽고-고치고-쓰는 동안 서로 기다리게 함
+    if fcntl is None:
+        yield
+        return
+    with open(SAVE_FILE + ".lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _write_users(data):
+    # 임시 파일 이름은 쓸 때마다 새로 만들어서 다른 프로세스의 임시 파일과 겹치지 않게 함
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(SAVE_FILE)),
+                                    prefix=os.path.basename(SAVE_FILE) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            # 들여쓰기 없이 한 줄로 (계정이 많아도 파일이 작고 읽기/쓰기가 빠름). 읽을 때는 예전 형식도 그대로 읽힘
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, SAVE_FILE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _users_cache["signature"] = _file_signature(SAVE_FILE)
+    _users_cache["data"] = copy.deepcopy(data)
+
+def save_all_users(data):
+    with _users_lock, _file_lock(), timer(STORAGE_SECONDS, op="save_users"):
+        _write_users(data)
+
+def _migrate_users_file():
+    # 예전 단일 계정(threads_token) 형식을 threads_accounts 로 옮김. 프로세스당 처음 한 번만 실행.
+    global _users_migrated
+    _users_migrated = True
+    if not os.path.exists(SAVE_FILE):
+        return
+    with _file_lock():
+        try:
+            with open(SAVE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        changed = False
+        for uid, udata in data.items():
+            if "threads_accounts" not in udata:
+                udata["threads_accounts"] = {}
+                if udata.get("threads_token"):
+                    udata["threads_accounts"]["기본 계정"] = {"secret": udata.get("threads_secret", ""), "token": udata.get("threads_token", "")}
+                changed = True
+        if changed: _write_users(data)
+
+def _cached_users():
+    # 호출하는 쪽에서 _users_lock 을 잡고 있어야 함. 공유 캐시를 그대로 돌려주므로 고치면 안 됨
+    if not _users_migrated:
+        _migrate_users_file()
+    signature = _file_signature(SAVE_FILE)
+    if signature is None:
+        return {}
+    if signature != _users_cache["signature"]:
+        try:
+            with open(SAVE_FILE, 'r', encoding='utf-8') as f, timer(STORAGE_SECONDS, op="load_users"):
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        _users_cache["signature"] = signature
+        _users_cache["data"] = data
+    return _users_cache["data"]
+
+def load_all_users():
+    with _users_lock:
+        # 세션마다 고쳐 쓰므로 공유 캐시 자체는 넘기지 않음
+        return copy.deepcopy(_cached_users())
+
+def load_account(user, account_name):
+    # 발행 직전에 토큰을 찾을 때: 전체를 복사하지 않고 그 계정 정보만 꺼냄 (없으면 None)
+    with _users_lock:
+        acc_info = _cached_users().get(user, {}).get("threads_accounts", {}).get(account_name)
+        return dict(acc_info) if acc_info is not None else None
+
+def update_all_users(mutator):
+    # 최신 파일을 읽어서 고치고 바로 저장 (백그라운드 작업이 화면의 저장과 엇갈려 덮어쓰지 않도록)
+    with _users_lock, _file_lock():
+        signature = _file_signature(SAVE_FILE)
+        if signature is not None and signature == _users_cache["signature"]:
+            data = copy.deepcopy(_users_cache["data"])
+        elif signature is None:
+            data = {}
+        else:
+            with open(SAVE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        result = mutator(data)
+        _write_users(data)
+        return result
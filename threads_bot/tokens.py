@@ -0,0 +1,115 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from .publisher import exchange_long_lived_token, refresh_long_lived_token
+from .storage import load_all_users, update_all_users
+
+logger = logging.getLogger(__name__)
+
+# 만료까지 이 기간 이하로 남은 토큰을 갱신 (기본 7일)
+RENEW_BEFORE_SECONDS = int(os.environ.get("THREADS_BOT_TOKEN_RENEW_BEFORE", str(7 * 24 * 3600)))
+# 백그라운드 갱신 주기 (기본 6시간)
+RENEW_INTERVAL_SECONDS = int(os.environ.get("THREADS_BOT_TOKEN_RENEW_INTERVAL", str(6 * 3600)))
+# 동시에 갱신 요청을 보낼 계정 수
+RENEW_WORKERS = int(os.environ.get("THREADS_BOT_TOKEN_RENEW_WORKERS", "16"))
+# 갱신에 실패한 계정은 이 시간 동안 다시 시도하지 않음
+RENEW_RETRY_SECONDS = 6 * 3600
+
+# ---------------------------------------------
+# 🔑 스레드 토큰 만료 관리
+# ---------------------------------------------
+def needs_renewal(acc_info, now=None):
+    now = now or time.time()
+    if acc_info.get("token_retry_after", 0) > now:
+        return False
+    expires_at = acc_info.get("token_expires_at")
+    # 만료일을 모르는 (예전에 등록한) 토큰도 한 번 갱신해서 만료일을 알아 둔다
+    return expires_at is None or expires_at - now <= RENEW_BEFORE_SECONDS
+
+def token_expiry_label(acc_info, now=None):
+    expires_at = acc_info.get("token_expires_at")
+    if not expires_at:
+        return "⏳ 만료일 모름"
+    days = int((expires_at - (now or time.time())) // 86400)
+    # 화면 표시는 한국 시간 기준
+    expires_kst = datetime.utcfromtimestamp(expires_at) + timedelta(hours=9)
+    if days < 0:
+        return f"❌ 만료됨 ({expires_kst:%Y-%m-%d})"
+    return f"⏳ 만료: {expires_kst:%Y-%m-%d} (D-{days})"
+
+def _request_new_token(acc_info):
+    # 장기 토큰이면 refresh, 안 되면(아직 단기 토큰이면) 시크릿으로 교환
+    ok, body = refresh_long_lived_token(acc_info["token"])
+    if not ok and acc_info.get("secret"):
+        ok, body = exchange_long_lived_token(acc_info["token"], acc_info["secret"])
+    return ok, body
+
+def _apply_result(data, uid, acc_name, ok, body, now):
+    acc_info = data.get(uid, {}).get("threads_accounts", {}).get(acc_name)
+    if acc_info is None:
+        return None  # 그 사이 삭제된 계정
+    if ok and body.get("access_token"):
+        acc_info["token"] = body["access_token"]
+        acc_info["token_issued_at"] = int(now)
+        acc_info["token_expires_at"] = int(now + body["expires_in"]) if body.get("expires_in") else None
+        acc_info.pop("token_error", None)
+        acc_info.pop("token_retry_after", None)
+        return body["access_token"]
+    acc_info["token_error"] = body if isinstance(body, str) else str(body)
+    acc_info["token_retry_after"] = int(now + RENEW_RETRY_SECONDS)
+    return None
+
+def renew_tokens(targets, max_workers=RENEW_WORKERS):
+    # targets: [(uid, acc_name, acc_info), ...] → 동시에 갱신하고, 결과는 사용자 파일에 한 번에 저장
+    if not targets:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets))), thread_name_prefix="token-renew") as pool:
+        responses = list(pool.map(lambda t: _request_new_token(t[2]), targets))
+    now = time.time()
+
+    def apply(data):
+        return [_apply_result(data, uid, acc_name, ok, body, now)
+                for (uid, acc_name, _), (ok, body) in zip(targets, responses)]
+
+    # 예약에는 토큰이 없고 발행할 때 사용자 파일에서 찾으므로, 여기서 저장하면 대기 중인 예약에도 바로 반영됨
+    new_tokens = update_all_users(apply)
+    return [(uid, acc_name, token is not None, None if token else body)
+            for (uid, acc_name, _), (ok, body), token in zip(targets, responses, new_tokens)]
+
+def renew_expiring_tokens(users=None, force=False):
+    # users 를 주면 그 사용자들만, 아니면 전체. 결과: [(uid, 계정, 성공 여부, 오류), ...]
+    data = load_all_users()
+    now = time.time()
+    targets = []
+    for uid, udata in data.items():
+        if users is not None and uid not in users:
+            continue
+        for acc_name, acc_info in udata.get("threads_accounts", {}).items():
+            if acc_info.get("token") and (force or needs_renewal(acc_info, now)):
+                targets.append((uid, acc_name, acc_info))
+    return renew_tokens(targets)
+
+def _renew_forever():
+    while True:
+        try:
+            results = renew_expiring_tokens()
+            if results:
+                logger.info("토큰 갱신 %d건 (실패 %d건)", len(results), sum(1 for r in results if not r[2]))
+        except Exception:
+            logger.exception("토큰 자동 갱신 중 오류")
+        time.sleep(RENEW_INTERVAL_SECONDS)
+
+_renewer = None
+_renewer_lock = threading.Lock()
+
+def start_token_renewer():
+    global _renewer
+    with _renewer_lock:
+        if _renewer is None:
+            _renewer = threading.Thread(target=_renew_forever, name="token-renewer", daemon=True)
+            _renewer.start()
+    return _renewer
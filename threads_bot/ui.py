@@ -0,0 +1,706 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from .bulk_import import parse_schedule_import
+from .core import get_core
+from .drafts import DEFAULT_PARALLELISM, MAX_PARALLELISM, generate_draft, generate_drafts, parse_topics
+from .metrics import RENDER_SECONDS, timer
+from .prefetch import PREFETCH_DAILY_QUOTA, PREFETCH_DAYS, PREFETCH_SLOTS, slot_label
+from .publisher import CAROUSEL_MAX_ITEMS, CAROUSEL_MIN_ITEMS, normalize_media
+from .recurrence import WEEKDAY_NAMES, describe, dump_rule, load_rule
+from .schedule_store import to_post_ts
+from .tokens import token_expiry_label
+
+# 페이지들은 화면 배치만 정하고, 실제 화면 조각은 전부 여기서 그린다.
+
+def record_render_time(script_started, page_file):
+    # 이번 실행(첫 접속이면 import 포함)에 걸린 시간. 로그인 화면/예약 관리만 할 때 얼마나 빠른지 확인용
+    # (화면에는 띄우지 않고 로그와 지표에만 남김. 성능 지표 페이지의 "화면 그리기"에서 확인)
+    elapsed_ms = (time.perf_counter() - script_started) * 1000
+    logging.getLogger("threads_bot.startup").info("render %s %.1fms", page_file, elapsed_ms)
+    RENDER_SECONDS.observe(elapsed_ms / 1000, part=os.path.basename(page_file))
+
+# ---------------------------------------------
+# 🔒 로그인 (로그인 전이면 로그인 화면을 그리고 여기서 멈춤)
+# ---------------------------------------------
+def require_login(script_started, page_file):
+    core = get_core()
+    users_data = core.users()
+
+    if "logged_in_user" not in st.session_state:
+        st.session_state["logged_in_user"] = None
+        if "auto_login" in st.query_params:
+            saved_id = st.query_params["auto_login"]
+            if saved_id in users_data:
+                st.session_state["logged_in_user"] = saved_id
+
+    if st.session_state["logged_in_user"] is None:
+        st.title("🔒 스레드 봇 로그인")
+        tab1, tab2 = st.tabs(["로그인", "새 사용자 추가"])
+        with tab1:
+            st.subheader("계정 접속")
+            login_id = st.text_input("아이디")
+            login_pw = st.text_input("비밀번호", type="password")
+            if st.button("로그인", type="primary"):
+                if login_id in users_data:
+                    stored_pw = users_data[login_id].get("password", "")
+                    if stored_pw == "" or stored_pw == login_pw:
+                        st.session_state["logged_in_user"] = login_id
+                        st.query_params["auto_login"] = login_id
+                        st.rerun()
+                    else: st.error("⚠️ 비밀번호가 틀렸습니다.")
+                else: st.error("⚠️ 등록되지 않은 아이디입니다.")
+        with tab2:
+            st.subheader("신규 계정 생성")
+            new_id = st.text_input("새로 만들 아이디")
+            new_pw = st.text_input("새 비밀번호", type="password")
+            if st.button("사용자 생성"):
+                if new_id in users_data: st.error("⚠️ 이미 존재하는 아이디입니다.")
+                elif not new_id or not new_pw: st.warning("⚠️ 아이디와 비밀번호를 모두 입력해주세요.")
+                elif core.update_users(lambda d: _add_user(d, new_id, new_pw)):
+                    st.success(f"🎉 '{new_id}' 생성 완료! 로그인 탭에서 로그인해주세요.")
+                else: st.error("⚠️ 이미 존재하는 아이디입니다.")
+        record_render_time(script_started, page_file)
+        st.stop()
+
+    return st.session_state["logged_in_user"], users_data
+
+# 사용자 파일 쓰기는 항상 core.update_users 로 최신 내용을 받아 자기 항목만 바꿈
+# (화면을 그릴 때 읽은 users_data 를 통째로 저장하면 그 사이 백그라운드 토큰 갱신이 쓴 값을 덮어씀)
+def _add_user(data, user, password):
+    if user in data: return False
+    data[user] = {"password": password, "gemini_api_key": "", "threads_accounts": {}}
+    return True
+
+def _set_user_field(data, user, key, value):
+    data[user][key] = value
+
+def _add_account(data, user, acc_name, acc_info):
+    accounts = data[user].setdefault("threads_accounts", {})
+    if acc_name in accounts: return False
+    accounts[acc_name] = acc_info
+    return True
+
+# ==========================================
+# 🗂️ 사이드바: 정보 및 꿀팁 가이드
+# ==========================================
+def render_sidebar(current_user):
+    bot_now = datetime.utcnow() + timedelta(hours=9)
+    bot_now_str = bot_now.strftime("%Y-%m-%d %H:%M")
+
+    with st.sidebar:
+        st.success(f"👤 **{current_user}**님 접속 중")
+        st.info(f"⏰ 봇 기준 현재 시간:\n\n**{bot_now_str}**")
+
+        if st.button("🚪 로그아웃"):
+            st.session_state["logged_in_user"] = None
+            if "auto_login" in st.query_params:
+                del st.query_params["auto_login"]
+            st.rerun()
+
+        st.divider()
+        st.subheader("💡 수익화 타임어택 전략")
+
+        with st.expander("📌 1. 시간대별 추천템", expanded=True):
+            st.markdown("""
+            **☀️ 아침 / 점심**
+            * 색조 화장품
+            * 사무용품, 청소용품
+
+            **🌤️ 오후 (식후)**
+            * 영양제, 생필품, 간식
+
+            **🌙 저녁 / 취침전**
+            * 장난감, 주방용품
+            * 기초 화장품 (스킨케어)
+            ---
+            **📅 시기별 타겟**
+            * **평일:** 사무용품
+            * **주말:** 장난감
+            * **시즌:** 여름/겨울/명절템
+            """)
+
+        with st.expander("🔄 2. 재사용 주기 (대략적)", expanded=True):
+            st.markdown("""
+            * **매일 (1일 1회↑):** 스하리글, 틱톡
+            * **3일 간격:** 쿠팡 파트너스
+            * **매주 (7일 간격):** 일상글, 뉴스픽
+            """)
+
+        with st.expander("📚 3. 아이템 공부법", expanded=True):
+            st.markdown("""
+            네이버에 **'홈쇼핑 모아 편성표'** 검색!
+            시간대별 방송 상품을 참고하면 아이디어 획득 가능.
+            """)
+
+# ==========================================
+# ⚙️ 환경 설정
+# ==========================================
+def render_settings(current_user, users_data):
+    core = get_core()
+    user_config = users_data.get(current_user, {})
+
+    st.header("1. Gemini API 설정")
+    new_gemini = st.text_input("🔑 Gemini API 키", value=user_config.get("gemini_api_key", ""), type="password")
+    if st.button("Gemini 키 저장"):
+        core.update_users(lambda d: _set_user_field(d, current_user, "gemini_api_key", new_gemini))
+        st.success("✅ Gemini API 키가 저장되었습니다.")
+        time.sleep(1)
+        st.rerun()
+
+    st.divider()
+    st.header("2. 스레드 다중 계정 관리")
+    accounts = user_config.get("threads_accounts", {})
+    if accounts:
+        st.write("📋 **현재 등록된 계정 목록**")
+        for acc_name, acc_info in accounts.items():
+            with st.expander(f"📌 {acc_name}"):
+                st.caption(f"앱 시크릿: {acc_info['secret'][:5]}... / 토큰: {acc_info['token'][:10]}... / {token_expiry_label(acc_info)}")
+                if acc_info.get("token_error"): st.caption(f"⚠️ 마지막 자동 갱신 실패: {acc_info['token_error'][:100]}")
+                col_btn1, col_btn2 = st.columns(2)
+                with col_btn1:
+                    if st.button("✨ 60일 토큰 갱신", key=f"renew_{acc_name}", type="primary"):
+                        with st.spinner("갱신 중..."):
+                            _, _, suc, err = core.renew_tokens(current_user, acc_name, acc_info)
+                            if suc:
+                                st.success("🎉 장기 토큰으로 갱신 완료! (대기 중인 예약에도 반영됨)")
+                                time.sleep(1)
+                                st.rerun()
+                            else: st.error(f"⚠️ 실패: {err}")
+                with col_btn2:
+                    if st.button("🗑️ 계정 삭제", key=f"del_{acc_name}"):
+                        core.update_users(lambda d: d[current_user].get("threads_accounts", {}).pop(acc_name, None))
+                        st.warning(f"'{acc_name}' 계정이 삭제되었습니다.")
+                        time.sleep(1)
+                        st.rerun()
+        if st.button("🔄 만료 임박 토큰 모두 갱신", key="renew_all_tokens"):
+            with st.spinner("계정 토큰을 한꺼번에 갱신하는 중..."):
+                results = core.renew_expiring_tokens(current_user)
+            if not results: st.info("갱신이 필요한 토큰이 없습니다.")
+            else:
+                failed = [acc for _, acc, ok, _ in results if not ok]
+                st.success(f"🎉 {len(results) - len(failed)}개 계정 토큰 갱신 완료!")
+                if failed: st.error(f"⚠️ 갱신 실패: {', '.join(failed)}")
+    else:
+        st.info("아직 등록된 스레드 계정이 없습니다. 아래에서 추가해주세요.")
+
+    with st.form("add_account_form"):
+        st.subheader("➕ 새 스레드 계정 추가")
+        new_acc_name = st.text_input("1. 계정 별명 (예: 맛집 리뷰용, 일상용)")
+        new_secret = st.text_input("2. 스레드 앱 시크릿 코드", type="password")
+        new_token = st.text_input("3. 스레드 액세스 토큰 (현재)", type="password")
+        if st.form_submit_button("이 계정 추가하기"):
+            if not new_acc_name or not new_secret or not new_token: st.error("⚠️ 모든 항목을 입력해주세요.")
+            elif new_acc_name in accounts: st.error("⚠️ 이미 같은 별명의 계정이 존재합니다.")
+            elif not core.update_users(lambda d: _add_account(d, current_user, new_acc_name, {
+                    "secret": new_secret, "token": new_token, "token_issued_at": int(time.time())})):
+                st.error("⚠️ 이미 같은 별명의 계정이 존재합니다.")
+            else:
+                st.success(f"🎉 '{new_acc_name}' 추가 완료!")
+                time.sleep(1)
+                st.rerun()
+
+    st.divider()
+    st.header("3. 비밀번호 변경")
+    with st.form("change_password_form"):
+        current_pw = st.text_input("현재 비밀번호", type="password")
+        new_pw = st.text_input("새 비밀번호", type="password")
+        confirm_pw = st.text_input("새 비밀번호 확인", type="password")
+
+        if st.form_submit_button("비밀번호 변경"):
+            if users_data[current_user].get("password", "") != current_pw:
+                st.error("⚠️ 현재 비밀번호가 일치하지 않습니다.")
+            elif new_pw != confirm_pw:
+                st.error("⚠️ 새 비밀번호가 서로 다릅니다.")
+            elif not new_pw:
+                st.error("⚠️ 새 비밀번호를 입력해주세요.")
+            else:
+                core.update_users(lambda d: _set_user_field(d, current_user, "password", new_pw))
+                st.success("✅ 비밀번호가 성공적으로 변경되었습니다!")
+                time.sleep(1)
+                st.rerun()
+
+    st.divider()
+    st.header("4. 초안 미리 만들기")
+    render_prefetch_settings(current_user, users_data)
+
+def render_prefetch_settings(current_user, users_data):
+    core = get_core()
+    user_config = users_data.get(current_user, {})
+    accounts = user_config.get("threads_accounts", {})
+    st.caption("정해 둔 시간대가 다가오면 백그라운드에서 Gemini 초안을 미리 만들어 대시보드에 올려 둡니다. "
+               f"시간대: {', '.join(f'{label} {hour}시' for label, hour in PREFETCH_SLOTS.values())}")
+    if not accounts or not user_config.get("gemini_api_key"):
+        st.info("Gemini 키와 스레드 계정을 먼저 등록해주세요.")
+        return
+
+    config = user_config.get("draft_prefetch") or {}
+    slot_names = {label: slot for slot, (label, _) in PREFETCH_SLOTS.items()}
+    day_names = {label: days for days, label in PREFETCH_DAYS.items()}
+    plans = config.get("plans") or []
+    import pandas as pd  # 로그인 화면 등 다른 화면이 pandas 를 불러오지 않도록 여기서만
+    with st.form("draft_prefetch_form"):
+        enabled = st.checkbox("⚡ 초안 미리 만들기 사용", value=config.get("enabled", False))
+        # 비어 있어도 열 종류가 글자로 잡히도록 string 형식의 표로 넘김
+        table = pd.DataFrame({"계정": [p["account"] for p in plans], "시간대": [PREFETCH_SLOTS[p["slot"]][0] for p in plans],
+                              "요일": [PREFETCH_DAYS[p.get("days", "all")] for p in plans], "주제": [p["topic"] for p in plans]},
+                             dtype="string")
+        edited = st.data_editor(
+            table, num_rows="dynamic", key="draft_prefetch_plans", hide_index=True,
+            column_config={"계정": st.column_config.SelectboxColumn(options=list(accounts), required=True),
+                           "시간대": st.column_config.SelectboxColumn(options=list(slot_names), required=True),
+                           "요일": st.column_config.SelectboxColumn(options=list(day_names), required=True, default="매일"),
+                           "주제": st.column_config.TextColumn(required=True)})
+        if st.form_submit_button("미리 만들기 설정 저장"):
+            new_plans = [{"account": row["계정"], "slot": slot_names[row["시간대"]], "days": day_names.get(row["요일"], "all"),
+                          "topic": row["주제"].strip()}
+                         for row in edited.fillna("").to_dict("records")
+                         if row["계정"] in accounts and row["시간대"] in slot_names and row["주제"].strip()]
+            core.update_users(lambda d: _set_user_field(d, current_user, "draft_prefetch", {"enabled": enabled, "plans": new_plans}))
+            st.success(f"✅ 저장했습니다. (계획 {len(new_plans)}개{', 사용 중' if enabled else ', 꺼 둠'})")
+    used = core.draft_pool.used_today(user_config["gemini_api_key"])
+    st.caption(f"오늘 미리 만든 초안: {used} / {PREFETCH_DAILY_QUOTA}건 (Gemini 키 기준, 대시보드에서 직접 만드는 건 제외)")
+
+# ==========================================
+# 📅 예약 관리 (이 안에서의 클릭은 이 부분만 다시 그림)
+# ==========================================
+SCHEDULE_PAGE_SIZE = 20
+REPEAT_OPTIONS = {"반복 안 함": None, "매일": {"every_days": 1}, "3일마다": {"every_days": 3}, "매주": {"every_days": 7},
+                  "요일 지정": "weekdays", "N일마다": "every_n"}
+MEDIA_OPTIONS = {"📝 글만": "TEXT", "🖼️ 이미지 1장": "IMAGE", f"🎠 캐러셀 (이미지 {CAROUSEL_MIN_ITEMS}~{CAROUSEL_MAX_ITEMS}장)": "CAROUSEL"}
+STATUS_FILTERS = {"전체": None, "⏰ 대기 중": ["pending"], "🚀 발행 중": ["processing"], "🔁 재시도 대기": ["retrying"], "❌ 실패": ["failed"]}
+
+def recurrence_input(key):
+    # 반복 설정 위젯. 반복 안 함이면 None, 아니면 규칙 dict (저장 전에 dump_rule 로 검사)
+    choice = st.selectbox("🔁 반복", list(REPEAT_OPTIONS), key=f"{key}_repeat",
+                          help="같은 글을 정해진 간격으로 다시 올립니다. 다음 회차는 발행이 끝난 뒤에 하나씩만 잡힙니다.")
+    rule = REPEAT_OPTIONS[choice]
+    if rule is None: return None
+    if rule == "weekdays":
+        rule = {"weekdays": st.multiselect("요일", list(range(7)), format_func=lambda d: WEEKDAY_NAMES[d], key=f"{key}_weekdays")}
+    elif rule == "every_n":
+        rule = {"every_days": st.number_input("며칠마다", min_value=1, max_value=365, value=2, key=f"{key}_every")}
+    else: rule = dict(rule)
+    end = st.radio("반복 종료", ["계속", "날짜까지", "횟수만큼"], horizontal=True, key=f"{key}_end")
+    if end == "날짜까지": rule["until"] = str(st.date_input("종료 날짜", key=f"{key}_until"))
+    elif end == "횟수만큼": rule["count"] = st.number_input("총 횟수", min_value=1, max_value=1000, value=10, key=f"{key}_count")
+    return rule
+
+def media_input(key):
+    # 첨부 이미지 위젯. (종류, 주소 줄 목록) 을 돌려주고 검사는 저장/발행할 때 normalize_media 로
+    media_type = MEDIA_OPTIONS[st.radio("🖼️ 첨부", list(MEDIA_OPTIONS), horizontal=True, key=f"{key}_media")]
+    if media_type == "TEXT": return media_type, []
+    urls = st.text_area("이미지 주소 (한 줄에 하나, 누구나 열 수 있는 https 주소)", key=f"{key}_media_urls", height=100,
+                        help="스레드 서버가 이 주소에서 이미지를 직접 내려받습니다. 캐러셀은 적은 순서대로 올라갑니다.")
+    return media_type, urls.splitlines()
+
+def _media_label(sched):
+    if sched.get("media_type") == "IMAGE": return " | 🖼️"
+    if sched.get("media_type") == "CAROUSEL": return f" | 🎠 {len(sched.get('media_urls') or [])}장"
+    return ""
+
+def _schedule_title(sched):
+    disp_acc = sched.get('account_name', '기본 계정')
+    repeat = f" | 🔁 {describe(load_rule(sched['recurrence']), sched.get('occurrences', 0))}" if sched.get("recurrence") else ""
+    repeat += _media_label(sched)
+    if sched.get("status") == "failed": return f"❌ [업로드 실패] {sched['post_time']} | 📌 [{disp_acc}]{repeat}"
+    if sched.get("status") == "processing": return f"🚀 [발행 중] {sched['post_time']} | 📌 [{disp_acc}]{repeat}"
+    if sched.get("status") == "retrying": return f"🔁 [재시도 대기 {sched.get('attempts', 0)}회 실패] {sched['post_time']} | 📌 [{disp_acc}]{repeat}"
+    return f"⏰ {sched['post_time']} | 📌 [{disp_acc}]{repeat}"
+
+def _open_schedule_editor(schedule_id):
+    st.session_state["editing_schedule_id"] = schedule_id
+
+def _save_schedule(schedule_id):
+    new_date = st.session_state[f"date_{schedule_id}"]
+    new_time = st.session_state[f"time_{schedule_id}"]
+    new_text = st.session_state[f"text_{schedule_id}"]
+    new_datetime_str = f"{new_date} {new_time.strftime('%H:%M')}"
+    fields = {"text": new_text, "post_time": new_datetime_str, "status": "pending", "error_msg": None, "attempts": 0, "next_attempt_at": None}
+    if st.session_state.get(f"repeat_{schedule_id}") is False: fields["recurrence"] = None
+    if get_core().edit_schedule(schedule_id, **fields):
+        st.session_state["editing_schedule_id"] = None
+        st.session_state["schedule_flash"] = "✅ 예약 수정 완료!"
+    else: st.session_state["schedule_flash"] = "⚠️ 지금 발행 중인 게시물이라 수정할 수 없습니다."
+
+def _cancel_schedule(schedule_id):
+    if get_core().cancel_schedule(schedule_id):
+        st.session_state["editing_schedule_id"] = None
+        st.session_state["schedule_flash"] = "🗑️ 예약이 삭제되었습니다."
+    else: st.session_state["schedule_flash"] = "⚠️ 지금 발행 중인 게시물이라 취소할 수 없습니다."
+
+def _move_schedule_page(delta):
+    st.session_state["sched_page"] = st.session_state.get("sched_page", 0) + delta
+
+def _render_schedule_editor(sched):
+    if sched.get("recurrence"):
+        st.checkbox("🔁 반복 유지", value=True, key=f"repeat_{sched['id']}", help="끄고 저장하면 이번 회차만 올리고 반복을 멈춥니다.")
+        if sched.get("status") == "pending" and sched.get("error_msg"): st.warning(f"⚠️ {sched['error_msg']}")
+    if sched.get("status") == "failed":
+        st.error(f"⚠️ 에러 원인: {sched.get('error_msg')}")
+        st.info("💡 시간을 미래로 다시 변경하고 [수정 내용 저장]을 누르면 재시도합니다.")
+    elif sched.get("status") == "retrying":
+        retry_at = datetime.utcfromtimestamp(sched.get("next_attempt_at") or 0) + timedelta(hours=9)
+        st.warning(f"⚠️ 일시적 오류: {sched.get('error_msg')}")
+        st.info(f"🔁 {retry_at.strftime('%Y-%m-%d %H:%M:%S')}에 자동으로 다시 시도합니다.")
+
+    st.text_area("내용 수정:", value=sched['text'], height=100, key=f"text_{sched['id']}")
+    if sched.get("media_urls"): st.caption("🖼️ 첨부 이미지: " + ", ".join(sched["media_urls"]))
+    try:
+        exist_dt = datetime.strptime(sched['post_time'], "%Y-%m-%d %H:%M")
+        exist_date = exist_dt.date()
+        exist_time = exist_dt.time()
+    except (TypeError, ValueError):
+        exist_date = datetime.now().date()
+        exist_time = datetime.now().time()
+
+    col_date, col_time = st.columns(2)
+    with col_date: st.date_input("날짜 변경", value=exist_date, key=f"date_{sched['id']}")
+    with col_time: st.time_input("시간 변경", value=exist_time, key=f"time_{sched['id']}", step=60)
+
+    col_btn1, col_btn2, col_btn3 = st.columns(3)
+    with col_btn1: st.button("💾 수정 내용 저장", key=f"edit_{sched['id']}", type="primary", on_click=_save_schedule, args=(sched["id"],))
+    with col_btn2: st.button("🗑️ 예약 취소 (삭제)", key=f"del_{sched['id']}", on_click=_cancel_schedule, args=(sched["id"],))
+    with col_btn3: st.button("닫기", key=f"close_{sched['id']}", on_click=_open_schedule_editor, args=(None,))
+
+@st.fragment
+def render_schedule_manager(current_user, accounts):
+    with timer(RENDER_SECONDS, part="schedule_list"):
+        _render_schedule_manager(current_user, accounts)
+
+def _render_schedule_manager(current_user, accounts):
+    core = get_core()
+    account_names = list(accounts.keys())
+    # 수정/취소 버튼의 콜백은 fragment 재실행 중이라 화면에 직접 그리지 않고 메시지만 남겨 둠
+    flash = st.session_state.pop("schedule_flash", None)
+    if flash: st.toast(flash)
+    col_title, col_refresh = st.columns([3, 1])
+    with col_title:
+        st.subheader("📅 내 예약된 게시물 관리")
+    with col_refresh:
+        st.button("🔄 예약 상태 새로고침")  # 누르면 이 부분만 다시 그려짐
+
+    with st.expander("📥 예약 일괄 가져오기 (CSV / JSONL)"):
+        st.caption("각 줄에 `account_name`, `post_time`(YYYY-MM-DD HH:MM), `text` 가 있어야 합니다. CSV는 첫 줄이 열 이름입니다.  \n"
+                   "이미지를 붙이려면 `media_urls` (JSONL은 목록, CSV는 `|` 로 구분)와 필요하면 `media_type` (IMAGE / CAROUSEL)을 넣으세요.")
+        import_file = st.file_uploader("예약 파일 선택", type=["csv", "jsonl"], key="schedule_import_file")
+        if import_file is not None and st.button("📥 가져오기", type="primary"):
+            records, import_errors = parse_schedule_import(import_file, import_file.name, current_user, accounts)
+            if records:
+                core.add_schedules(records)
+                st.success(f"🎉 {len(records)}건을 예약했습니다.")
+            if import_errors:
+                st.error(f"⚠️ {len(import_errors)}줄은 건너뛰었습니다.")
+                st.dataframe([{"줄": line_no, "오류": msg} for line_no, msg in import_errors[:500]], hide_index=True)
+            elif not records:
+                st.warning("⚠️ 가져올 예약이 없습니다.")
+
+    col_f1, col_f2, col_f3 = st.columns([2, 1, 2])
+    with col_f1: filter_accounts = st.multiselect("계정", account_names, key="sched_filter_accounts", placeholder="전체 계정")
+    with col_f2: filter_status = st.selectbox("상태", list(STATUS_FILTERS.keys()), key="sched_filter_status")
+    with col_f3: filter_dates = st.date_input("기간", value=(), key="sched_filter_dates")
+
+    start = end = None
+    if len(filter_dates) >= 1: start = f"{filter_dates[0]} 00:00"
+    if len(filter_dates) == 2: end = f"{filter_dates[1]} 23:59"
+
+    # 조건이 바뀌면 첫 페이지로
+    filter_key = (tuple(filter_accounts), filter_status, start, end)
+    if st.session_state.get("sched_filter_key") != filter_key:
+        st.session_state["sched_filter_key"] = filter_key
+        st.session_state["sched_page"] = 0
+    page = st.session_state.get("sched_page", 0)
+
+    filters = dict(account_names=filter_accounts, statuses=STATUS_FILTERS[filter_status], start=start, end=end, limit=SCHEDULE_PAGE_SIZE)
+    my_schedules, total = core.query_schedules(current_user, offset=page * SCHEDULE_PAGE_SIZE, **filters)
+    # 지우거나 상태가 바뀌어 줄이 줄었으면 마지막 페이지로
+    last_page = max(0, (total - 1) // SCHEDULE_PAGE_SIZE)
+    if page > last_page:
+        page = st.session_state["sched_page"] = last_page
+        my_schedules, total = core.query_schedules(current_user, offset=page * SCHEDULE_PAGE_SIZE, **filters)
+    if not total:
+        if filter_accounts or STATUS_FILTERS[filter_status] or start: st.info("조건에 맞는 예약 게시물이 없습니다.")
+        else: st.info("현재 대기 중인 예약 게시물이 없습니다.")
+        return
+
+    # 수정 위젯은 펼친 한 건에만 만든다
+    editing_id = st.session_state.get("editing_schedule_id")
+    for sched in my_schedules:
+        if sched["id"] == editing_id:
+            with st.container(border=True):
+                st.markdown(f"**{_schedule_title(sched)}**")
+                _render_schedule_editor(sched)
+            continue
+        col_item, col_open = st.columns([6, 1])
+        with col_item:
+            st.markdown(f"{_schedule_title(sched)}  \n{sched['text'][:60]}")
+        with col_open:
+            st.button("✏️ 수정", key=f"open_{sched['id']}", on_click=_open_schedule_editor, args=(sched["id"],))
+
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev: st.button("◀ 이전", disabled=page <= 0, key="sched_prev", on_click=_move_schedule_page, args=(-1,))
+    with col_info: st.caption(f"{page + 1} / {last_page + 1} 페이지 · 총 {total}건")
+    with col_next: st.button("다음 ▶", disabled=page >= last_page, key="sched_next", on_click=_move_schedule_page, args=(1,))
+
+# ==========================================
+# ⚡ 미리 만들어 둔 초안
+# ==========================================
+def _use_pooled_draft(draft_id):
+    draft = get_core().draft_pool.take(draft_id)
+    if draft is None: st.toast("⚠️ 이미 사용한 초안입니다.")
+    else:
+        st.session_state["draft_text"] = draft["text"]
+        st.session_state["dashboard_account"] = draft["account_name"]
+
+def _schedule_pooled_draft(current_user, draft_id):
+    core = get_core()
+    draft = core.draft_pool.take(draft_id)
+    if draft is None:
+        st.toast("⚠️ 이미 사용한 초안입니다.")
+        return
+    core.add_schedule({"user": current_user, "account_name": draft["account_name"], "text": draft["text"],
+                       "post_ts": max(draft["slot_at"], time.time())})
+    st.toast(f"📅 [{draft['account_name']}] {slot_label(draft['slot'], draft['slot_at'])} 예약 완료!")
+
+def _discard_pooled_draft(draft_id):
+    get_core().draft_pool.discard(draft_id)
+
+def render_draft_pool(current_user, accounts):
+    drafts = [d for d in get_core().draft_pool.ready_for(current_user) if d["account_name"] in accounts]
+    if not drafts: return
+    st.subheader("⚡ 미리 만들어 둔 초안")
+    for d in drafts:
+        with st.container(border=True):
+            st.markdown(f"**{slot_label(d['slot'], d['slot_at'])}** | 📌 [{d['account_name']}] {d['topic']}")
+            if d["status"] == "error":
+                st.error(f"⚠️ 생성 실패: {d['error']}")
+                st.button("🔁 다시 만들기", key=f"pool_retry_{d['id']}", on_click=_discard_pooled_draft, args=(d["id"],),
+                          help="다음 차례에 백그라운드에서 다시 만듭니다.")
+                continue
+            st.text(d["text"])
+            col_use, col_sched, col_drop = st.columns(3)
+            with col_use: st.button("✏️ 수정해서 올리기", key=f"pool_use_{d['id']}", on_click=_use_pooled_draft, args=(d["id"],))
+            with col_sched: st.button("📅 이 시간대에 예약", key=f"pool_sched_{d['id']}", type="primary",
+                                      on_click=_schedule_pooled_draft, args=(current_user, d["id"]))
+            with col_drop: st.button("🗑️ 버리기", key=f"pool_drop_{d['id']}", on_click=_discard_pooled_draft, args=(d["id"],))
+    st.divider()
+
+# ==========================================
+# 🚀 대시보드: 초안 생성 → 업로드/예약
+# ==========================================
+def render_dashboard(current_user, users_data):
+    core = get_core()
+    user_config = users_data.get(current_user, {})
+    accounts = user_config.get("threads_accounts", {})
+    if not user_config.get("gemini_api_key") or not accounts:
+        st.warning("⚠️ 옆의 [⚙️ 계정 및 API 설정] 탭으로 가서 Gemini 키와 스레드 계정을 먼저 등록해주세요.")
+        return
+
+    col_main, col_tips = st.columns([7, 3])
+
+    with col_main:
+        render_draft_pool(current_user, accounts)
+        if st.session_state.get("dashboard_account") not in accounts: st.session_state.pop("dashboard_account", None)
+        selected_account = st.selectbox("📤 어느 계정에 업로드하시겠습니까?", list(accounts.keys()), key="dashboard_account")
+
+        st.divider()
+        st.subheader("📝 1단계: 게시글 자동 작성")
+        topic = st.text_input("💡 오늘 스레드에 올릴 주제를 짧게 적어주세요:", value="오늘 점심 메뉴 추천 좀")
+
+        regenerate = st.checkbox("🔁 저장된 초안 무시하고 새로 생성", help="같은 주제로 만든 초안이 있어도 Gemini에 다시 요청합니다.")
+
+        if st.button("✨ 게시글 초안 생성하기", type="primary"):
+            with st.spinner("Gemini가 트렌디한 글을 작성하고 있습니다..."):
+                try:
+                    st.session_state["draft_text"] = generate_draft(user_config["gemini_api_key"], topic, use_cache=not regenerate)
+                except Exception: st.error("⚠️ 텍스트 생성 오류! API 키를 확인해주세요.")
+
+        if "draft_text" in st.session_state:
+            st.divider()
+            st.subheader(f"🚀 2단계: [{selected_account}]에 스레드 업로드")
+            final_text = st.text_area("수정 후 업로드할 최종 내용:", value=st.session_state["draft_text"], height=150)
+            media_type, media_lines = media_input("new_post")
+            is_scheduled = st.checkbox("⏰ 이 게시물을 예약해서 올리기")
+
+            if is_scheduled:
+                col1, col2 = st.columns(2)
+                with col1: sched_date = st.date_input("예약 날짜")
+                with col2: sched_time = st.time_input("예약 시간", step=60)
+                sched_datetime_str = f"{sched_date} {sched_time.strftime('%H:%M')}"
+                repeat_rule = recurrence_input("new_sched")
+
+                if st.button("📅 지정한 시간에 예약하기", type="primary"):
+                    try:
+                        recurrence = dump_rule(repeat_rule)
+                        media_type, media_urls = normalize_media(media_type, media_lines)
+                    except ValueError as e: st.error(f"⚠️ 설정 오류: {e}")
+                    else:
+                        core.add_schedule({
+                            "user": current_user, "account_name": selected_account, "text": final_text,
+                            "post_time": sched_datetime_str, "recurrence": recurrence,
+                            "media_type": media_type, "media_urls": media_urls
+                        })
+                        repeat_label = f" ({describe(repeat_rule)} 반복)" if recurrence else ""
+                        st.success(f"🎉 [{selected_account}] 계정에 {sched_datetime_str} 업로드 예약 완료!{repeat_label}")
+                        del st.session_state["draft_text"]
+                        time.sleep(1)
+                        st.rerun()
+            else:
+                if st.button("📤 지금 바로 업로드하기", type="primary"):
+                    try: media_type, media_urls = normalize_media(media_type, media_lines)
+                    except ValueError as e: st.error(f"⚠️ 설정 오류: {e}")
+                    else:
+                        with st.spinner("스레드에 게시물을 전송하고 있습니다..."):
+                            success, message = core.publish_now({"user": current_user, "account_name": selected_account, "text": final_text,
+                                                                 "media_type": media_type, "media_urls": media_urls})
+                            if success is None:
+                                st.info(f"⏳ [{selected_account}] 계정의 발행 한도에 걸려 약 {int(message) + 1}초 뒤 자동으로 업로드되도록 예약했습니다.")
+                                del st.session_state["draft_text"]
+                            elif success:
+                                st.balloons()
+                                st.success(f"🎉 [{selected_account}] 계정에 성공적으로 업로드되었습니다!")
+                                del st.session_state["draft_text"]
+                                time.sleep(1)
+                                st.rerun()
+                            else: st.error(f"⚠️ 업로드 실패: {message}")
+
+        st.divider()
+        with st.expander("📚 여러 주제 한 번에 초안 만들기 (일괄 생성)"):
+            batch_text = st.text_area("주제 목록 (한 줄에 하나씩)", height=120, placeholder="아침 출근길 색조 화장품\n점심 먹고 영양제 챙기기\n주말 아이 장난감 추천")
+            batch_file = st.file_uploader("또는 주제 파일 업로드 (.txt 줄 단위 / .csv 첫 번째 열)", type=["txt", "csv"])
+            batch_parallel = st.number_input("동시 생성 개수 (Gemini 요청 한도에 맞게 조절)", min_value=1, max_value=MAX_PARALLELISM, value=DEFAULT_PARALLELISM)
+
+            if st.button("✨ 일괄 초안 생성하기"):
+                topics = parse_topics(batch_text, batch_file)
+                if not topics: st.warning("⚠️ 주제를 한 개 이상 입력해주세요.")
+                else:
+                    progress = st.progress(0.0, text=f"0 / {len(topics)} 생성 완료")
+                    live = st.container()
+                    results = [None] * len(topics)
+                    for done, (i, b_topic, b_text, b_err) in enumerate(generate_drafts(user_config["gemini_api_key"], topics, batch_parallel, use_cache=not regenerate), start=1):
+                        results[i] = {"topic": b_topic, "text": b_text, "error": str(b_err) if b_err else None}
+                        progress.progress(done / len(topics), text=f"{done} / {len(topics)} 생성 완료")
+                        if b_err: live.error(f"⚠️ [{b_topic}] 생성 실패: {b_err}")
+                        else: live.success(f"✅ [{b_topic}] {b_text[:60]}")
+                    st.session_state["batch_drafts"] = results
+                    st.rerun()
+
+        if st.session_state.get("batch_drafts"):
+            st.subheader("🗂️ 일괄 생성된 초안")
+            batch_drafts = st.session_state["batch_drafts"]
+            for i, draft in enumerate(batch_drafts):
+                if draft is None: continue
+                with st.expander(f"📝 {draft['topic']}", expanded=False):
+                    if draft["error"]:
+                        st.error(f"⚠️ 생성 실패: {draft['error']}")
+                    else:
+                        b_final = st.text_area("내용:", value=draft["text"], height=120, key=f"batch_text_{i}")
+                        b_account = st.selectbox("업로드 계정", list(accounts.keys()), index=list(accounts.keys()).index(selected_account), key=f"batch_acc_{i}")
+                        col_bd, col_bt = st.columns(2)
+                        with col_bd: b_date = st.date_input("예약 날짜", key=f"batch_date_{i}")
+                        with col_bt: b_time = st.time_input("예약 시간", step=60, key=f"batch_time_{i}")
+                        if st.button("📅 이 초안 예약하기", key=f"batch_sched_{i}", type="primary"):
+                            b_post_time = f"{b_date} {b_time.strftime('%H:%M')}"
+                            core.add_schedule({
+                                "user": current_user, "account_name": b_account, "text": b_final, "post_time": b_post_time
+                            })
+                            batch_drafts[i] = None
+                            st.success(f"🎉 [{b_account}] 계정에 {b_post_time} 업로드 예약 완료!")
+                            time.sleep(1)
+                            st.rerun()
+                    if st.button("🗑️ 이 초안 버리기", key=f"batch_drop_{i}"):
+                        batch_drafts[i] = None
+                        st.rerun()
+            if st.button("🧹 일괄 초안 모두 비우기"):
+                del st.session_state["batch_drafts"]
+                st.rerun()
+
+        st.divider()
+        render_schedule_manager(current_user, accounts)
+
+    with col_tips:
+        st.empty()
+
+# ==========================================
+# 📜 발행 기록 (색인으로 조건에 맞는 줄만 찾아 읽음)
+# ==========================================
+HISTORY_PAGE_SIZE = 50
+HISTORY_OUTCOMES = {"전체": None, "✅ 발행 성공": ["ok"], "🔁 재시도 예정": ["retry"], "❌ 실패": ["failed"]}
+OUTCOME_LABELS = {"ok": "✅ 성공", "retry": "🔁 재시도", "failed": "❌ 실패"}
+
+def _move_history_page(delta):
+    st.session_state["history_page"] = st.session_state.get("history_page", 0) + delta
+
+def _history_row(entry):
+    media = {"IMAGE": "🖼️", "CAROUSEL": f"🎠 {entry.get('media_count', 0)}장"}.get(entry.get("media_type"), "")
+    return {
+        "시각": (datetime.utcfromtimestamp(entry["ts"]) + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M:%S"),
+        "계정": entry["account"],
+        "결과": OUTCOME_LABELS.get(entry["outcome"], entry["outcome"]),
+        "경로": "예약" if entry.get("source") == "schedule" else "바로 업로드",
+        "예약 시각": entry.get("post_time", ""),
+        "시도": entry.get("attempt", 1),
+        "걸린 시간(초)": entry["latency_ms"] / 1000 if entry.get("latency_ms") is not None else None,
+        "첨부": media,
+        "내용": entry.get("text", "")[:80],
+        "미디어 ID": entry.get("media_id", ""),
+        "오류": entry.get("error", ""),
+    }
+
+def render_history(current_user, users_data):
+    with timer(RENDER_SECONDS, part="history"):
+        _render_history(current_user, users_data)
+
+def _render_history(current_user, users_data):
+    core = get_core()
+    account_names = list(users_data.get(current_user, {}).get("threads_accounts", {}).keys())
+    today = (datetime.utcnow() + timedelta(hours=9)).date()
+
+    col_f1, col_f2, col_f3 = st.columns([2, 1, 2])
+    with col_f1: filter_accounts = st.multiselect("계정", account_names, key="history_accounts", placeholder="전체 계정")
+    with col_f2: filter_outcome = st.selectbox("결과", list(HISTORY_OUTCOMES.keys()), key="history_outcome")
+    with col_f3: filter_dates = st.date_input("기간", value=(today - timedelta(days=6), today), key="history_dates")
+
+    start = end = None
+    if len(filter_dates) >= 1:
+        start = to_post_ts(f"{filter_dates[0]} 00:00")
+        end = to_post_ts(f"{filter_dates[-1]} 00:00") + 86400
+
+    counts = core.history_daily_counts(current_user, account_names=filter_accounts, start=start, end=end)
+    col_ok, col_retry, col_failed = st.columns(3)
+    col_ok.metric("✅ 발행 성공", sum(n for (_, o), n in counts.items() if o == "ok"))
+    col_retry.metric("🔁 재시도 예정", sum(n for (_, o), n in counts.items() if o == "retry"))
+    col_failed.metric("❌ 실패", sum(n for (_, o), n in counts.items() if o == "failed"))
+    if counts:
+        import pandas as pd  # 다른 화면이 pandas 를 불러오지 않도록 여기서만
+        by_day = {}
+        for (day, outcome), n in counts.items():
+            by_day.setdefault(day, {"성공": 0, "실패": 0})["성공" if outcome == "ok" else "실패"] += n
+        st.bar_chart(pd.DataFrame.from_dict(by_day, orient="index").sort_index())
+
+    # 조건이 바뀌면 첫 페이지로
+    filter_key = (tuple(filter_accounts), filter_outcome, start, end)
+    if st.session_state.get("history_filter_key") != filter_key:
+        st.session_state["history_filter_key"] = filter_key
+        st.session_state["history_page"] = 0
+    page = st.session_state.get("history_page", 0)
+
+    filters = dict(account_names=filter_accounts, start=start, end=end, outcomes=HISTORY_OUTCOMES[filter_outcome], limit=HISTORY_PAGE_SIZE)
+    entries, total = core.query_history(current_user, offset=page * HISTORY_PAGE_SIZE, **filters)
+    last_page = max(0, (total - 1) // HISTORY_PAGE_SIZE)
+    if page > last_page:
+        page = st.session_state["history_page"] = last_page
+        entries, total = core.query_history(current_user, offset=page * HISTORY_PAGE_SIZE, **filters)
+    if not total:
+        st.info("조건에 맞는 발행 기록이 없습니다.")
+        return
+    st.dataframe([_history_row(e) for e in entries], hide_index=True)
+
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev: st.button("◀ 이전", key="history_prev", disabled=page <= 0, on_click=_move_history_page, args=(-1,))
+    with col_info: st.caption(f"{page + 1} / {last_page + 1} 페이지 · 총 {total}건")
+    with col_next: st.button("다음 ▶", key="history_next", disabled=page >= last_page, on_click=_move_history_page, args=(1,))